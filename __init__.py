@@ -5,17 +5,23 @@ Automatically scrape IndiaBix questions and create Anki flashcards
 
 from aqt import mw, gui_hooks
 from aqt.qt import QAction, QTimer
-from aqt.utils import showInfo
-from . import ui
-from .auto_sync import run_auto_sync, CurrentAffairsAutoSync
-from .current_affairs_ui import show_current_affairs_dialog
+from aqt.utils import showInfo, tooltip
+
+# Everything else (scraper, BeautifulSoup, requests, dialogs) is imported
+# on first use, so loading the add-on only registers menu items, and the
+# startup sync only loads the scraper when a sync is actually due.
+# benchmarks/bench_startup_import.py checks this.
 
 __version__ = "1.1.0"
 
+# Tools menu toggle; unchecked again once a profile has been written
+_profile_action = None
+
 
 def show_import_dialog():
     """Show the main IndiaBix import dialog"""
     try:
+        from . import ui
         dialog = ui.IndiaBixDialog(mw)
         dialog.exec()
     except Exception as e:
@@ -25,8 +31,9 @@ def show_import_dialog():
 def show_sync_current_affairs():
     """Manually trigger Current Affairs sync"""
     try:
+        from .auto_sync import CurrentAffairsAutoSync
         syncer = CurrentAffairsAutoSync()
-        syncer.auto_sync(show_notifications=True)
+        syncer.auto_sync(show_notifications=True, force=True)
     except Exception as e:
         showInfo(f"Error syncing Current Affairs: {str(e)}")
 
@@ -34,11 +41,44 @@ def show_sync_current_affairs():
 def show_current_affairs_manager():
     """Show Current Affairs management dialog"""
     try:
+        from .current_affairs_ui import show_current_affairs_dialog
         show_current_affairs_dialog()
     except Exception as e:
         showInfo(f"Error opening Current Affairs manager: {str(e)}")
 
 
+def start_auto_sync():
+    """Run the background startup sync, importing it only if a sync is due"""
+    try:
+        from .sync_history import startup_sync_due
+        if not startup_sync_due(mw.addonManager.getConfig(__name__)):
+            return
+        from .auto_sync import run_auto_sync
+    except Exception as e:
+        print(f"Auto-sync error: {str(e)}")
+        return
+    run_auto_sync()
+
+
+def toggle_profiling(checked: bool):
+    """Arm (or disarm) cProfile/tracemalloc capture of the next scrape, import or sync"""
+    from . import profiling
+    profiling.on_captured = on_profile_captured
+    profiling.arm(checked)
+    if checked:
+        tooltip("The next IndiaBix scrape, import or sync will be profiled")
+
+
+def on_profile_captured(operation: str, paths):
+    """Reset the menu toggle and say where the reports went; may run on any thread"""
+    def done():
+        if _profile_action is not None:
+            _profile_action.setChecked(False)
+        if paths:
+            tooltip(f"Profile of {operation} saved to<br>" + "<br>".join(paths), period=8000)
+    mw.taskman.run_on_main(done)
+
+
 def init_addon():
     """Initialize the add-on and add menu items"""
     # Create main import action
@@ -56,8 +96,16 @@ def init_addon():
     manager_action.triggered.connect(show_current_affairs_manager)
     mw.form.menuTools.addAction(manager_action)
     
-    # Run auto-sync after a short delay (to let Anki finish loading)
-    QTimer.singleShot(3000, run_auto_sync)  # 3 second delay
+    # Profile the next scrape/import/sync (reports go to the profiles folder)
+    global _profile_action
+    _profile_action = QAction("Profile next IndiaBix operation", mw)
+    _profile_action.setCheckable(True)
+    _profile_action.toggled.connect(toggle_profiling)
+    mw.form.menuTools.addAction(_profile_action)
+    
+    # Run auto-sync after a short delay (to let Anki finish loading);
+    # it fetches in the background and only imports on the main thread
+    QTimer.singleShot(3000, start_auto_sync)  # 3 second delay
 
 
 # Initialize the add-on when Anki loads
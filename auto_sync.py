@@ -4,57 +4,218 @@ Automatically imports daily current affairs questions on Anki startup
 """
 
 import os
-import json
+import time
+import calendar
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 from aqt import mw
+from aqt.operations import QueryOp
 from aqt.utils import showInfo, tooltip
-from .scraper import IndiaBixScraper
+from .scraper import IndiaBixScraper, PageNotFoundError, DEFAULT_BASE_URL
 from .deck_builder import DeckBuilder
+from .http_cache import get_http_cache
+from .http_session import get_shared_session, build_session
+from .rate_limiter import get_request_scheduler
+from .dedup_index import get_duplicate_index
+from .note_type import MODEL_NAME
+from .tracing import make_tracer, NULL_TRACER
+from . import profiling
+from .sync_history import (
+    get_sync_history_store, startup_sync_due, questions_hash, STATUS_FAILED, STATUS_NEVER, SETTLE_DAYS
+)
+
+# Listing page for one month of current affairs, relative to the site's base
+# URL; {year} and {month} are filled in. Override with the
+# 'current_affairs_index_url' config option.
+INDEX_PATH = "/current-affairs/{year:04d}/{month:02d}/"
+DEFAULT_INDEX_URL = DEFAULT_BASE_URL + INDEX_PATH
+
+# A month index must list at least this share of the month's days so far;
+# fewer links means the page isn't the full listing (e.g. a redirect to a
+# "latest" page)
+MIN_INDEX_COVERAGE = 0.5
+
+# Near-duplicate index files with a background sync in progress
+_index_refreshes = set()
 
 
 class CurrentAffairsAutoSync:
     """Handles automatic daily syncing of Current Affairs"""
     
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Args:
+            base_url: Site to sync from instead of the 'base_url' config
+                option (default https://www.indiabix.com), e.g. a local
+                test server
+        """
         self.addon_dir = os.path.dirname(__file__)
-        self.sync_file = os.path.join(self.addon_dir, "sync_history.json")
         self.config = mw.addonManager.getConfig(__name__)
+        self.base_url = (base_url or self.config.get('base_url') or DEFAULT_BASE_URL).rstrip('/')
+        # Migrates sync_history.json on first use
+        self.history = get_sync_history_store(self.addon_dir)
+        # Stage timings of the running operation (see start_trace)
+        self.tracer = NULL_TRACER
+        self.last_trace: List[str] = []
+    
+    def start_trace(self, operation: str):
+        """Trace the scrapers and deck builders made from now on ('trace_stages' option)"""
+        self.tracer = make_tracer(self.config, operation)
+    
+    def finish_trace(self) -> List[str]:
+        """
+        Stop tracing and print the stage summary
         
-    def get_sync_history(self) -> Dict[str, bool]:
-        """Load sync history from file"""
-        if os.path.exists(self.sync_file):
-            try:
-                with open(self.sync_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading sync history: {e}")
-                return {}
-        return {}
+        Returns:
+            The summary lines, also kept in self.last_trace (empty when
+            tracing is off)
+        """
+        tracer, self.tracer = self.tracer, NULL_TRACER
+        self.last_trace = tracer.summary()
+        tracer.close()
+        for line in self.last_trace:
+            print(line)
+        return self.last_trace
     
-    def save_sync_history(self, history: Dict[str, bool]):
-        """Save sync history to file"""
-        try:
-            with open(self.sync_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2)
-        except Exception as e:
-            print(f"Error saving sync history: {e}")
+    def mark_date_synced(self, date_str: str, questions: Optional[List[Dict]] = None):
+        """Mark a date as synced, recording what was imported"""
+        if questions is None:
+            self.history.record_success(date_str)
+        else:
+            self.history.record_success(date_str, len(questions), questions_hash(questions))
     
-    def mark_date_synced(self, date_str: str):
-        """Mark a date as synced"""
-        history = self.get_sync_history()
-        history[date_str] = True
-        self.save_sync_history(history)
+    def mark_date_failed(self, date_str: str, reason: str, status: str = STATUS_FAILED):
+        """Record an unsuccessful sync attempt and why it failed"""
+        self.history.record_failure(date_str, reason, status)
+    
+    def mark_date_missing(self, date_str: str, reason: str):
+        """
+        Record that a date had no content, backing off before the next try
+        and eventually marking it as never published
+        """
+        record = self.history.record_miss(
+            date_str, reason,
+            base_ttl=self.config.get('negative_cache_minutes', 30) * 60,
+            give_up_after=self.config.get('never_published_after', 5)
+        )
+        if record.status == STATUS_NEVER:
+            print(f"Current Affairs for {date_str} marked as never published "
+                  f"after {record.misses} attempts")
     
     def is_date_synced(self, date_str: str) -> bool:
         """Check if a date has been synced"""
-        history = self.get_sync_history()
-        return history.get(date_str, False)
+        return self.history.is_synced(date_str)
+    
+    def make_deck_builder(self) -> DeckBuilder:
+        """
+        DeckBuilder for the main collection with the configured duplicate handling
+        
+        Sync imports run on the main thread, so the near-duplicate index is
+        not synced here but in the background afterwards (see
+        refresh_duplicate_index). Until its first build has finished,
+        imports skip the near-duplicate check.
+        """
+        index = get_duplicate_index(self.config, mw.col)
+        if index is not None and not index.is_built():
+            print("Near-duplicate index is still being built, not checking this import")
+            self.refresh_duplicate_index()
+            index = None
+        return DeckBuilder(
+            mw.col,
+            duplicate_index=index,
+            skip_duplicates=self.config.get('near_duplicates', 'flag') == 'skip',
+            tracer=self.tracer,
+            sync_index=False
+        )
+    
+    def refresh_duplicate_index(self):
+        """Sync the near-duplicate index with the collection on a background thread"""
+        index = get_duplicate_index(self.config, mw.col)
+        if index is None or index.path in _index_refreshes:
+            return
+        _index_refreshes.add(index.path)
+        
+        def op(col) -> int:
+            model = col.models.by_name(MODEL_NAME)
+            return index.sync(col, model['id']) if model else 0
+        
+        def on_success(count: int):
+            _index_refreshes.discard(index.path)
+            if count:
+                print(f"Near-duplicate index: {count} notes indexed")
+        
+        def on_failure(e: Exception):
+            _index_refreshes.discard(index.path)
+            print(f"Error syncing near-duplicate index: {e}")
+        
+        QueryOp(parent=mw, op=op, success=on_success).failure(on_failure).run_in_background()
     
     def get_current_affairs_url(self, date: datetime) -> str:
         """Generate URL for a specific date's current affairs"""
         date_str = date.strftime("%Y-%m-%d")
-        return f"https://www.indiabix.com/current-affairs/{date_str}/"
+        return f"{self.base_url}/current-affairs/{date_str}/"
+    
+    def get_month_index(self, year: int, month: int,
+                        scraper: Optional[IndiaBixScraper] = None,
+                        fetch: bool = True) -> Optional[Dict[str, str]]:
+        """
+        Dates actually published in a month, from its listing page
+        
+        The index is cached in the sync history: for good once it was
+        fetched after the month (plus a few late-publishing days) was over,
+        otherwise for 'month_index_hours'. A missing listing page or one
+        without day links is cached as "no index". A page listing fewer
+        than MIN_INDEX_COVERAGE of the month's days so far isn't trusted
+        and is fetched again once the cache entry expires.
+        
+        Args:
+            fetch: With False, only the cached index is used (however old),
+                so the call never touches the network
+        
+        Returns:
+            Dict mapping "YYYY-MM-DD" to the page URL, or None if there is
+            no usable index and each day has to be probed instead
+        """
+        key = f"{year:04d}-{month:02d}"
+        cached = self.history.get_month_index(key)
+        max_age = self.config.get('month_index_hours', 6) * 3600
+        if not fetch or (cached and (cached.complete or time.time() - cached.fetched < max_age)):
+            return cached.dates if cached else None
+        
+        template = self.config.get('current_affairs_index_url') or self.base_url + INDEX_PATH
+        url = template.format(year=year, month=month)
+        try:
+            found = (scraper or self.make_scraper()).discover_current_affairs(url)
+            dates = {date: page for date, page in found.items() if date.startswith(key)} or None
+        except PageNotFoundError:
+            dates = None
+        except Exception as e:
+            # Transient failure: keep whatever we had, and don't cache it
+            print(f"Error fetching Current Affairs index {url}: {e}")
+            return cached.dates if cached else None
+        
+        month_end = datetime(year, month, calendar.monthrange(year, month)[1])
+        now = datetime.now()
+        complete = now - month_end >= timedelta(days=SETTLE_DAYS)
+        days_so_far = min(month_end, now).day if (year, month) <= (now.year, now.month) else 0
+        if dates and len(dates) < days_so_far * MIN_INDEX_COVERAGE:
+            print(f"Current Affairs index {url} lists only {len(dates)} days, not using it")
+            dates, complete = None, False
+        self.history.put_month_index(key, dates, complete)
+        return dates
+    
+    def get_published_dates(self, start_date: datetime, end_date: datetime,
+                            scraper: Optional[IndiaBixScraper] = None,
+                            fetch: bool = True) -> Dict[str, Optional[Dict[str, str]]]:
+        """Month indexes ("YYYY-MM" -> get_month_index result) covering a date range"""
+        indexes = {}
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            indexes[f"{year:04d}-{month:02d}"] = self.get_month_index(year, month, scraper, fetch)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return indexes
     
     def get_week_number(self, date: datetime) -> int:
         """Get the week number within the month (1-5)"""
@@ -83,8 +244,32 @@ class CurrentAffairsAutoSync:
         
         return deck_name
     
-    def try_sync_date(self, date: datetime) -> Optional[Dict]:
-        """Try to sync current affairs for a specific date"""
+    def make_scraper(self, timeout: Optional[float] = None, session=None,
+                     deadline: Optional[float] = None) -> IndiaBixScraper:
+        """Scraper using the add-on's shared cache, session and rate limiter"""
+        return IndiaBixScraper(
+            timeout=timeout or self.config.get('timeout', 30),
+            cache=get_http_cache(self.config),
+            offline=self.config.get('offline_mode', False),
+            parser=self.config.get('html_parser', 'lxml'),
+            session=session or get_shared_session(self.config, min_pool_size=self.config.get('catchup_workers', 4)),
+            scheduler=get_request_scheduler(self.config),
+            base_url=self.base_url,
+            tracer=self.tracer,
+            deadline=deadline
+        )
+    
+    def try_sync_date(self, date: datetime,
+                      scraper: Optional[IndiaBixScraper] = None,
+                      force: bool = False, url: Optional[str] = None) -> Optional[Dict]:
+        """
+        Try to fetch current affairs for a specific date
+        
+        Dates that recently had no content are skipped without a request
+        until their back-off expires (force=True tries anyway).
+        Only touches the network and the sync history, so it is safe to
+        call from worker threads.
+        """
         date_str = date.strftime("%Y-%m-%d")
         
         # Check if already synced
@@ -92,13 +277,18 @@ class CurrentAffairsAutoSync:
             print(f"Current Affairs for {date_str} already synced")
             return None
         
-        # Try to scrape
-        url = self.get_current_affairs_url(date)
+        if not force and not self.history.should_fetch(date_str):
+            print(f"Current Affairs for {date_str} not available yet, skipping")
+            return None
+        
+        # Try to scrape (the month index may know the exact URL)
+        url = url or self.get_current_affairs_url(date)
         print(f"Attempting to sync Current Affairs from: {url}")
         
         try:
-            scraper = IndiaBixScraper(timeout=self.config.get('timeout', 30))
-            result = scraper.scrape_url(url, max_pages=1)
+            scraper = scraper or self.make_scraper()
+            # strict: a timeout must not look like a day without questions
+            result = scraper.scrape_url(url, max_pages=1, strict=True)
             
             if result and result.get('questions'):
                 return {
@@ -108,32 +298,111 @@ class CurrentAffairsAutoSync:
                 }
             else:
                 print(f"No questions found for {date_str}")
+                self.mark_date_missing(date_str, "No questions found")
                 return None
-                
+        
+        except PageNotFoundError as e:
+            print(f"No Current Affairs page for {date_str}")
+            self.mark_date_missing(date_str, str(e))
+            return None
+        except InterruptedError:
+            # Cancelled (e.g. the startup deadline passed); says nothing about the date
+            print(f"Sync of {date_str} cancelled")
+            return None
         except Exception as e:
             print(f"Error syncing {date_str}: {str(e)}")
+            self.mark_date_failed(date_str, str(e))
             return None
     
-    def auto_sync(self, show_notifications: bool = True):
+    def fetch_latest(self, force: bool = False, scraper: Optional[IndiaBixScraper] = None,
+                     deadline: Optional[float] = None) -> Optional[Dict]:
+        """
+        Fetch the newest unsynced day: today, falling back to yesterday
+        
+        Network only, so it can run on a background thread. No new attempt
+        is started once time.monotonic() passes deadline.
+        """
+        today = datetime.now()
+        for date in (today, today - timedelta(days=1)):
+            if deadline is not None and time.monotonic() >= deadline:
+                print("Current Affairs sync ran out of time")
+                return None
+            result = self.try_sync_date(date, scraper, force=force)
+            if result:
+                return result
+        return None
+    
+    def auto_sync(self, show_notifications: bool = True, force: bool = False):
         """
         Automatically sync current affairs
         Tries today first, then falls back to yesterday
+        
+        Without force, dates that recently had no content are not requested
+        again, so a startup with nothing new makes no requests at all.
         """
         # Check if auto-sync is enabled
         if not self.config.get('auto_sync_current_affairs', True):
             print("Auto-sync is disabled")
             return
         
-        today = datetime.now()
-        yesterday = today - timedelta(days=1)
+        self.start_trace("Current Affairs sync")
+        try:
+            with profiling.capture("Current Affairs sync"):
+                self.import_latest(self.fetch_latest(force=force), show_notifications)
+        finally:
+            self.finish_trace()
+    
+    def auto_sync_in_background(self, show_notifications: bool = True):
+        """
+        Startup sync that never blocks the main window
         
-        # Try today first
-        result = self.try_sync_date(today)
+        The fetch runs on Anki's background task pool and is cut off after
+        'startup_sync_deadline' seconds: every request's timeout is limited
+        to the time left, so one started just before the deadline can't
+        run past it. A day whose page arrived in time is kept and imported
+        even if parsing it finishes a moment later. The import is posted
+        back to the main thread. Skipped entirely if the previous startup
+        sync began less than 'auto_sync_interval_minutes' ago.
+        """
+        if not startup_sync_due(self.config, self.history):
+            return
+        self.history.set_meta('last_auto_sync', str(time.time()))
         
-        # If today not available, try yesterday
-        if not result:
-            result = self.try_sync_date(yesterday)
+        self.start_trace("Current Affairs startup sync")
+        budget = float(self.config.get('startup_sync_deadline', 20))
+        deadline = time.monotonic() + budget
+        # No request may run past the deadline, and transport retries
+        # (which would multiply a timeout) are turned off
+        session = build_session(pool_size=2, retries=0,
+                                keep_alive=self.config.get('http_keep_alive', True),
+                                user_agent=self.config.get('user_agent'))
+        scraper = self.make_scraper(session=session, deadline=deadline)
+        watchdog = threading.Timer(budget, scraper.cancel)
+        watchdog.daemon = True
+        
+        def fetch():
+            watchdog.start()
+            try:
+                with profiling.capture("Current Affairs startup fetch"):
+                    return self.fetch_latest(scraper=scraper, deadline=deadline)
+            finally:
+                watchdog.cancel()
+        
+        def on_done(future):
+            # Runs on the main thread
+            try:
+                result = future.result()
+                if mw.col is not None:  # Profile closed while fetching
+                    self.import_latest(result, show_notifications)
+            except Exception as e:
+                print(f"Auto-sync error: {str(e)}")
+            finally:
+                self.finish_trace()
         
+        mw.taskman.run_in_background(fetch, on_done)
+    
+    def import_latest(self, result: Optional[Dict], show_notifications: bool = True):
+        """Import a fetch_latest() result; must run on the main thread"""
         # If still no result, nothing to sync
         if not result:
             print("No new Current Affairs to sync")
@@ -145,7 +414,7 @@ class CurrentAffairsAutoSync:
             date_obj = datetime.strptime(result['date'], "%Y-%m-%d")
             deck_name = self.get_hierarchical_deck_name(date_obj)
             
-            builder = DeckBuilder(mw.col)
+            builder = self.make_deck_builder()
             
             # Add date tag
             date_tag = f"current-affairs-{result['date']}"
@@ -156,11 +425,14 @@ class CurrentAffairsAutoSync:
                 deck_name=deck_name,
                 questions=result['questions'],
                 tags=tags,
-                include_explanation=self.config.get('include_explanation', True)
+                include_explanation=self.config.get('include_explanation', True),
+                batch_size=self.config.get('batch_size', 50)
             )
             
             # Mark as synced
-            self.mark_date_synced(result['date'])
+            self.mark_date_synced(result['date'], result['questions'])
+            if builder.duplicate_index is not None:
+                self.refresh_duplicate_index()
             
             # Show notification
             if show_notifications and added > 0:
@@ -171,76 +443,154 @@ class CurrentAffairsAutoSync:
         except Exception as e:
             error_msg = f"Error importing Current Affairs: {str(e)}"
             print(error_msg)
+            self.mark_date_failed(result['date'], f"Import failed: {e}")
             if show_notifications:
                 showInfo(error_msg)
     
+    def import_result(self, result: Dict, builder: DeckBuilder) -> bool:
+        """
+        Import one date's questions into its weekly deck
+        Must run on the main thread; returns True if the date is now synced
+        """
+        date_str = result['date']
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+            deck_name = self.get_hierarchical_deck_name(date_obj)
+            date_tag = f"current-affairs-{date_str}"
+            tags = ['IndiaBix', 'CurrentAffairs', date_tag]
+            
+            added = builder.add_questions_batch(
+                deck_name=deck_name,
+                questions=result['questions'],
+                tags=tags,
+                include_explanation=self.config.get('include_explanation', True),
+                batch_size=self.config.get('batch_size', 50)
+            )
+            
+            # A re-sync of an already imported date adds nothing
+            # but still leaves the deck complete
+            if added > 0 or builder.last_stats['unchanged'] or builder.last_stats['updated']:
+                self.mark_date_synced(date_str, result['questions'])
+                return True
+            self.mark_date_failed(date_str, "No notes were imported")
+        except Exception as e:
+            print(f"Error importing {date_str}: {e}")
+            self.mark_date_failed(date_str, f"Import failed: {e}")
+        return False
+    
     def sync_date_range(self, start_date: datetime, end_date: datetime, 
-                       progress_callback=None) -> Dict[str, int]:
+                       progress_callback=None, max_workers: Optional[int] = None) -> Dict[str, int]:
         """
         Sync multiple dates (for catching up on missed days)
+        
+        Only dates listed in their month's index are fetched (every date
+        if a month has no index). They are fetched and parsed by a pool of
+        max_workers threads
+        (default: the 'catchup_workers' option), at most two per worker
+        ahead of the writer. Imports happen one at a time on the calling
+        thread, in date order, so progress_callback(date, stats) also fires
+        in date order.
+        
         Returns dict with stats
         """
+        self.start_trace("Current Affairs catch-up")
+        try:
+            with profiling.capture("Current Affairs catch-up"):
+                return self._sync_date_range(start_date, end_date, progress_callback, max_workers)
+        finally:
+            self.finish_trace()
+    
+    def _sync_date_range(self, start_date: datetime, end_date: datetime,
+                         progress_callback, max_workers: Optional[int]) -> Dict[str, int]:
         stats = {'synced': 0, 'skipped': 0, 'failed': 0}
-        current_date = start_date
+        # Already synced, never published, or backing off after a miss
+        skip = self.history.dates_to_skip(start_date.strftime("%Y-%m-%d"),
+                                          end_date.strftime("%Y-%m-%d"))
+        
+        scraper = self.make_scraper()
+        indexes = self.get_published_dates(start_date, end_date, scraper)
         
+        dates, urls = [], {}
+        current_date = start_date
         while current_date <= end_date:
             date_str = current_date.strftime("%Y-%m-%d")
+            index = indexes.get(date_str[:7])
+            if index is not None:
+                if date_str in index:
+                    urls[date_str] = index[date_str]
+                else:
+                    skip.add(date_str)  # Not published
+            dates.append(current_date)
+            current_date += timedelta(days=1)
+        pending = iter([date for date in dates if date.strftime("%Y-%m-%d") not in skip])
+        
+        workers = max(1, int(max_workers or self.config.get('catchup_workers', 4)))
+        builder = None
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
             
-            if self.is_date_synced(date_str):
-                stats['skipped'] += 1
-            else:
-                result = self.try_sync_date(current_date)
-                if result:
-                    try:
-                        # Use hierarchical deck name
-                        deck_name = self.get_hierarchical_deck_name(current_date)
-                        builder = DeckBuilder(mw.col)
-                        date_tag = f"current-affairs-{result['date']}"
-                        tags = ['IndiaBix', 'CurrentAffairs', date_tag]
-                        
-                        added = builder.add_questions_batch(
-                            deck_name=deck_name,
-                            questions=result['questions'],
-                            tags=tags,
-                            include_explanation=self.config.get('include_explanation', True)
-                        )
-                        
-                        if added > 0:
-                            self.mark_date_synced(result['date'])
+            def submit_next():
+                date = next(pending, None)
+                if date is not None:
+                    futures[date] = pool.submit(self.try_sync_date, date, scraper, False,
+                                                urls.get(date.strftime("%Y-%m-%d")))
+            
+            for _ in range(workers * 2):
+                submit_next()
+            
+            for current_date in dates:
+                if current_date.strftime("%Y-%m-%d") in skip:
+                    stats['skipped'] += 1
+                else:
+                    result = futures.pop(current_date).result()
+                    submit_next()
+                    if result:
+                        builder = builder or self.make_deck_builder()
+                        if self.import_result(result, builder):
                             stats['synced'] += 1
                         else:
                             stats['failed'] += 1
-                    except Exception as e:
-                        print(f"Error importing {date_str}: {e}")
+                    else:
                         stats['failed'] += 1
-                else:
-                    stats['failed'] += 1
-            
-            if progress_callback:
-                progress_callback(current_date, stats)
-            
-            current_date += timedelta(days=1)
+                
+                if progress_callback:
+                    progress_callback(current_date, stats)
         
+        if builder is not None and builder.duplicate_index is not None:
+            self.refresh_duplicate_index()
         return stats
     
     def get_missing_dates(self, days_back: int = 30) -> List[str]:
-        """Get list of dates that haven't been synced"""
+        """
+        Get list of dates that haven't been synced
+        
+        Dates missing from their month's index, or marked never published,
+        don't count. Only month indexes already cached by a catch-up are
+        used, so this never waits on the network (it runs when the Current
+        Affairs dialog opens).
+        """
         missing = []
         today = datetime.now()
+        start = (today - timedelta(days=days_back - 1)).strftime("%Y-%m-%d")
+        end = today.strftime("%Y-%m-%d")
+        synced = self.history.synced_dates(start, end) | self.history.never_published(start, end)
+        indexes = self.get_published_dates(today - timedelta(days=days_back - 1), today, fetch=False)
         
         for i in range(days_back):
             check_date = today - timedelta(days=i)
             date_str = check_date.strftime("%Y-%m-%d")
-            if not self.is_date_synced(date_str):
+            index = indexes.get(date_str[:7])
+            if date_str not in synced and (index is None or date_str in index):
                 missing.append(date_str)
         
         return missing
 
 
 def run_auto_sync():
-    """Run auto-sync on startup"""
+    """Run auto-sync on startup, in the background"""
     try:
         syncer = CurrentAffairsAutoSync()
-        syncer.auto_sync(show_notifications=True)
+        syncer.auto_sync_in_background(show_notifications=True)
     except Exception as e:
         print(f"Auto-sync error: {str(e)}")
@@ -0,0 +1,82 @@
+"""
+Benchmark: near-duplicate lookups against a 100k-note index
+
+Run from the repository root:
+    python benchmarks/bench_dedup_index.py [notes]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup_index import DuplicateIndex, signature
+
+COMMON = (
+    "which of the following is the who has been appointed as new in india "
+    "when was first launched by government minister scheme national state"
+).split()
+
+
+def make_vocabulary(rng: random.Random, size: int = 5000):
+    syllables = ['ka', 'ra', 'na', 'ma', 'shi', 'tri', 'pur', 'van', 'deep', 'ind',
+                 'gan', 'lok', 'sab', 'ha', 'ya', 'jal', 'bha', 'rat', 'sur', 'ya']
+    return [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def random_question(rng: random.Random, vocabulary) -> str:
+    """Current-affairs-like question: common phrasing plus rarer names"""
+    def word():
+        return rng.choice(COMMON) if rng.random() < 0.4 else rng.choice(vocabulary)
+
+    stem = ' '.join(word() for _ in range(rng.randint(10, 22)))
+    options = ' '.join(f"{label}. {' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3)))}"
+                       for label in 'ABCD')
+    return f"<p>{stem}?</p> {options}"
+
+
+def reword(text: str, rng: random.Random) -> str:
+    """Replace one word, the kind of edit IndiaBix makes between sections"""
+    words = text.split(' ')
+    words[rng.randrange(len(words))] = rng.choice(COMMON)
+    return ' '.join(words)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    questions = [random_question(rng, vocabulary) for _ in range(total)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DuplicateIndex(os.path.join(tmp, "bench.sqlite3"))
+
+        start = time.perf_counter()
+        index.add_many((f"g{i}", signature(text), i, 1, True) for i, text in enumerate(questions))
+        build = time.perf_counter() - start
+        print(f"Indexed {total} notes in {build:.1f}s ({total / build:.0f} notes/s), "
+              f"{os.path.getsize(index.path) / 1e6:.1f} MB on disk")
+
+        probes = [reword(rng.choice(questions), rng) for _ in range(500)]
+        probes += [random_question(rng, vocabulary) for _ in range(500)]
+        timings = []
+        found = 0
+        for text in probes:
+            start = time.perf_counter()
+            matches = index.find(signature(text))
+            timings.append(time.perf_counter() - start)
+            found += bool(matches)
+
+        timings.sort()
+        mean = sum(timings) / len(timings)
+        print(f"Checked {len(probes)} candidates (signature + lookup): "
+              f"mean {mean * 1e6:.0f} us, p50 {timings[len(timings) // 2] * 1e6:.0f} us, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us")
+        print(f"Reworded repeats flagged: {found} of 1000 candidates (500 are reworded)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Load test: scrape -> import against the local mock IndiaBix server
+
+Starts mock_indiabix.MockIndiaBixServer with the requested faults and runs
+the add-on's scraper against it, the way the import dialog and the Current
+Affairs catch-up do:
+
+    section cold   one section, max_workers pages in flight, empty page cache
+    section warm   the same section again; every page is revalidated (304)
+    month          a month of Current Affairs discovered from its index page,
+                   days fetched catchup_workers at a time
+    import         the scraped questions added with DeckBuilder (needs anki)
+
+Run from the repository root:
+    python benchmarks/bench_mock_scrape.py [--pages 50] [--workers 4] [--rate 20]
+        [--latency 0.05] [--jitter 0.02] [--throttle-rate 0.02] [--drop-rate 0.01]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pipeline import load_deck_builder
+from corpus import QUESTIONS_PER_PAGE
+from mock_indiabix import Faults, MockIndiaBixServer
+from http_cache import HttpCache
+from http_session import build_session
+from rate_limiter import RequestScheduler
+from scraper import IndiaBixScraper
+
+SECTION = "/aptitude/problems-on-trains/"
+
+
+def report(name: str, server: MockIndiaBixServer, elapsed: float, pages: int, questions: int):
+    stats = server.stats()
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats['statuses'].items()))
+    print(f"{name:<13} {elapsed:6.2f}s  {pages / elapsed:7.1f} pages/s  {questions:>6} questions  "
+          f"{stats['requests']} requests ({statuses}; dropped {stats['dropped']}), "
+          f"peak {stats['max_in_flight']} in flight")
+    server.reset_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--pages", type=int, default=50, help="pages in the section")
+    parser.add_argument("--workers", type=int, default=4, help="scraper max_workers")
+    parser.add_argument("--catchup-workers", type=int, default=4, help="days fetched in parallel")
+    parser.add_argument("--rate", type=float, default=20, help="requests/s per host (0 disables the limiter)")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=3, help="connection retries in the HTTP session")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--throttle-rate", type=float, default=0.02)
+    parser.add_argument("--unavailable-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.throttle_rate, retry_after=1,
+                    unavailable_rate=args.unavailable_rate, drop_rate=args.drop_rate, seed=args.seed)
+    server = MockIndiaBixServer(faults=faults, section_questions=args.pages * QUESTIONS_PER_PAGE,
+                                pagination_window=args.pages)
+
+    with server, tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, "cache.sqlite3"))
+        session = build_session(pool_size=max(args.workers, args.catchup_workers), retries=args.retries)
+        scheduler = (RequestScheduler(rate=args.rate, burst=max(1, int(args.rate * 2)),
+                                      max_concurrency=args.max_concurrency) if args.rate > 0 else None)
+        scraper = IndiaBixScraper(max_workers=args.workers, cache=cache, session=session,
+                                  scheduler=scheduler, base_url=server.base_url)
+        print(f"Mock server at {server.base_url}: {args.pages} pages, latency {args.latency}s "
+              f"+/- {args.jitter}s, 429 {args.throttle_rate:.0%}, 503 {args.unavailable_rate:.0%}, "
+              f"dropped {args.drop_rate:.0%}\n")
+
+        questions = []
+        for name in ("section cold", "section warm"):
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                questions = scraper.scrape_section(server.url(SECTION), max_pages=args.pages)
+            report(name, server, time.perf_counter() - start, args.pages, len(questions))
+
+        today = date.today()
+        start = time.perf_counter()
+        days = scraper.discover_current_affairs(server.url(f"/current-affairs/{today.year:04d}/{today.month:02d}/"))
+
+        def fetch_day(url):
+            try:
+                return scraper.scrape_section(url, max_pages=1, strict=True)
+            except Exception as e:
+                return e
+
+        with redirect_stdout(io.StringIO()), ThreadPoolExecutor(args.catchup_workers) as pool:
+            results = list(pool.map(fetch_day, days.values()))
+        day_questions = [q for result in results if isinstance(result, list) for q in result]
+        report("month", server, time.perf_counter() - start, len(days) + 1, len(day_questions))
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed:
+            print(f"{'':<13} {failed} of {len(days)} days failed after retries")
+
+        if scheduler is not None:
+            print(f"\n{scheduler.describe(server.base_url)}")
+
+        deck_builder = load_deck_builder()
+        if deck_builder is None:
+            print("\nanki is not installed; skipping the import stage")
+            return
+
+        from anki.collection import Collection
+        col = Collection(os.path.join(tmp, "load.anki2"))
+        try:
+            builder = deck_builder.DeckBuilder(col)
+            start = time.perf_counter()
+            added = builder.add_questions_batch("IndiaBix::Load", questions + day_questions)
+            elapsed = time.perf_counter() - start
+            print(f"\nimport        {elapsed:6.2f}s  {added / elapsed:7.0f} notes/s  {builder.last_stats}")
+        finally:
+            col.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Benchmark: single-pass parse_question vs. the previous multi-find version
+
+Run from the repository root:
+    python benchmarks/bench_parse_question.py
+"""
+
+import os
+import re
+import sys
+import time
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import IndiaBixScraper, format_question_text, format_explanation_text
+
+
+def parse_question_reference(question_div) -> Optional[Dict]:
+    """parse_question as it was before the single-pass extractor (multiple find() calls)"""
+    try:
+        question_data = {}
+        
+        # Extract question text - look for bix-td-qtxt class
+        question_text_elem = question_div.find('div', class_='bix-td-qtxt')
+        
+        if question_text_elem:
+            # Remove script and style elements
+            for script in question_text_elem(['script', 'style']):
+                script.decompose()
+            
+            # Find and convert images to absolute URLs
+            images = question_text_elem.find_all('img')
+            for img in images:
+                src = img.get('src', '')
+                if src:
+                    # Convert relative URLs to absolute
+                    absolute_url = urljoin('https://www.indiabix.com', src)
+                    img['src'] = absolute_url
+            
+            # Get HTML with images preserved
+            question_html = str(question_text_elem)
+            # Get text-only version and format it
+            raw_question_text = question_text_elem.get_text(strip=True)
+            formatted_question_text = format_question_text(raw_question_text)
+            
+            # Store both versions
+            question_data['question'] = formatted_question_text
+            question_data['question_html'] = question_html
+            question_data['has_images'] = len(images) > 0
+        else:
+            return None
+        
+        # Extract options - look for bix-opt-row divs
+        options = {}
+        option_rows = question_div.find_all('div', class_='bix-opt-row')
+        
+        for i, option_row in enumerate(option_rows):
+            # Get the option text
+            option_text = option_row.get_text(strip=True)
+            # Use A, B, C, D based on position
+            label = chr(65 + i)  # 65 is ASCII for 'A'
+            if option_text:
+                options[label] = option_text
+        
+        question_data['options'] = options
+        
+        # Extract answer
+        answer_div = question_div.find('div', class_='bix-ans-option')
+        if answer_div:
+            # Look for span with class containing 'option-svg-letter-'
+            # The answer letter is encoded in the class name (e.g., 'option-svg-letter-c')
+            answer_span = answer_div.find('span', class_=re.compile(r'option-svg-letter-'))
+            if answer_span:
+                span_classes = answer_span.get('class', [])
+                for cls in span_classes:
+                    if 'option-svg-letter-' in cls:
+                        # Extract the letter from the class name and convert to uppercase
+                        answer_letter = cls.split('-')[-1].upper()
+                        question_data['answer'] = answer_letter
+                        break
+            else:
+                # Fallback: try to extract from text (old method)
+                answer_text = answer_div.get_text(strip=True)
+                answer_match = re.search(r'([A-E])', answer_text)
+                if answer_match:
+                    question_data['answer'] = answer_match.group(1)
+        else:
+            # Backup: check for old class name
+            answer_span = question_div.find('span', class_='jq-hdnakqb')
+            if answer_span:
+                answer_text = answer_span.get_text(strip=True)
+                answer_match = re.search(r'([A-E])', answer_text)
+                if answer_match:
+                    question_data['answer'] = answer_match.group(1)
+        
+        # Extract explanation
+        explanation_div = question_div.find('div', class_='bix-ans-description')
+        if not explanation_div:
+            explanation_div = question_div.find('div', class_='bix-div-answer-description')
+        
+        if explanation_div:
+            # Remove script and style elements
+            for script in explanation_div(['script', 'style']):
+                script.decompose()
+            
+            # Find and convert images to absolute URLs
+            exp_images = explanation_div.find_all('img')
+            for img in exp_images:
+                src = img.get('src', '')
+                if src:
+                    absolute_url = urljoin('https://www.indiabix.com', src)
+                    img['src'] = absolute_url
+            
+            # Get text and format it for better readability
+            raw_text = explanation_div.get_text(strip=True)
+            formatted_text = format_explanation_text(raw_text)
+            
+            # Store both formatted text and HTML versions
+            question_data['explanation'] = formatted_text
+            question_data['explanation_html'] = str(explanation_div) if exp_images else ""
+        else:
+            question_data['explanation'] = ""
+            question_data['explanation_html'] = ""
+        
+        return question_data if question_data.get('question') else None
+        
+    except Exception as e:
+        print(f"Error parsing question: {str(e)}")
+        return None
+
+
+QUESTION_TEMPLATES = [
+    # Standard text question with the answer encoded in the class name
+    """<div class="bix-div-container">
+      <div class="bix-td-qtxt">Who was the first President of India?<script>track({n})</script></div>
+      <div class="bix-opt-row"><span class="option-svg-letter-a"></span>Rajendra Prasad</div>
+      <div class="bix-opt-row"><span class="option-svg-letter-b"></span>Nehru</div>
+      <div class="bix-opt-row"><span class="option-svg-letter-c"></span>Patel</div>
+      <div class="bix-opt-row"><span class="option-svg-letter-d"></span>Azad</div>
+      <div class="bix-ans-option"><span class="x option-svg-letter-a"></span></div>
+      <div class="bix-ans-description">Step 1:He was elected in 1950.So the answer is A.</div>
+    </div>""",
+    # Image question with an image in the explanation
+    """<div class="bix-div-container">
+      <div class="bix-td-qtxt">Choose the figure {n}.<img src="/_files/images/q{n}.png"><style>.x{{}}</style></div>
+      <div class="bix-opt-row"><img src="/_files/images/a.png"></div>
+      <div class="bix-opt-row"><img src="/_files/images/b.png"></div>
+      <div class="bix-opt-row">C</div><div class="bix-opt-row">D</div><div class="bix-opt-row">E</div>
+      <div class="bix-ans-option"><span class="option-svg-letter-e"></span></div>
+      <div class="bix-div-answer-description">Rotate 90 degrees.<img src="/_files/images/e{n}.png"></div>
+    </div>""",
+    # Code question, answer only in the text of the answer block
+    """<div class="bix-div-container">
+      <div class="bix-td-qtxt">What will be the output?#include <stdio.h>int main() {{ int i = {n}; printf("%d", i); return 0; }}</div>
+      <div class="bix-opt-row">0</div><div class="bix-opt-row">{n}</div>
+      <div class="bix-ans-option">Answer: Option B</div>
+      <div class="bix-ans-description">The output is {n}.Hence B.</div>
+    </div>""",
+    # Old markup with the hidden answer span
+    """<div class="bix-div-container">
+      <div class="bix-td-qtxt">Old style question {n}?</div>
+      <div class="bix-opt-row">Yes</div><div class="bix-opt-row">No</div>
+      <span class="jq-hdnakqb">B</span>
+    </div>""",
+]
+
+
+def build_page(questions: int) -> bytes:
+    """Build a page with the given number of question containers"""
+    blocks = [QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)].format(n=i) for i in range(questions)]
+    return ("<html><body>" + "".join(blocks) + "</body></html>").encode()
+
+
+def fresh_containers(scraper: IndiaBixScraper, html: bytes):
+    """parse_question mutates the tree, so every run needs its own soup"""
+    return scraper.parse_html(html).find_all('div', class_='bix-div-container')
+
+
+def time_parser(parse, scraper: IndiaBixScraper, html: bytes, rounds: int) -> float:
+    """Total seconds spent inside the parse function over all rounds"""
+    total = 0.0
+    for _ in range(rounds):
+        containers = fresh_containers(scraper, html)
+        start = time.perf_counter()
+        for div in containers:
+            parse(div)
+        total += time.perf_counter() - start
+    return total
+
+
+def main():
+    scraper = IndiaBixScraper()
+    html = build_page(40)
+    
+    # The new extractor must produce exactly the same records
+    reference = [parse_question_reference(d) for d in fresh_containers(scraper, html)]
+    current = [scraper.parse_question(d) for d in fresh_containers(scraper, html)]
+    if reference != current:
+        print("❌ Output differs from the reference implementation")
+        sys.exit(1)
+    print(f"✅ Output identical for {len(current)} questions")
+    
+    rounds = 50
+    old_time = time_parser(parse_question_reference, scraper, html, rounds)
+    new_time = time_parser(scraper.parse_question, scraper, html, rounds)
+    count = len(current) * rounds
+    
+    print(f"Reference (multi-find): {old_time:.3f}s  ({count / old_time:,.0f} questions/s)")
+    print(f"Single-pass extractor:  {new_time:.3f}s  ({count / new_time:,.0f} questions/s)")
+    print(f"Speedup: {old_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
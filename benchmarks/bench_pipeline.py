@@ -0,0 +1,262 @@
+"""
+Benchmark: throughput and peak memory of each scrape/import stage
+
+Runs the pipeline over a synthetic section (see corpus.py) without network
+access, at several sizes from a single page up to 10k questions:
+
+    fetch    fetch_content served from an offline HttpCache
+    parse    parse_html (lxml + QuestionPageStrainer)
+    extract  iter_page_questions / parse_question, formatting included
+    format   format_question_text + format_explanation_text on their own
+    build    DeckBuilder.build_note          (needs anki)
+    insert   DeckBuilder.add_notes           (needs anki)
+
+Timings are the best of several runs; peak memory comes from a separate
+tracemalloc run, since tracing slows everything down. Results are compared
+with benchmarks/baselines.json and stages that got slower or bigger than the
+tolerance are flagged.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline.py [--sizes 5,100,1000,10000] [--repeat 3]
+                                        [--save-baseline] [--check] [--tolerance 0.25]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import platform
+import tempfile
+import importlib
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Dict, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+sys.path.insert(0, ROOT)
+
+from corpus import BASE_URL, build_section
+from http_cache import HttpCache
+from scraper import IndiaBixScraper, extract_question_parts, format_question_text, format_explanation_text
+
+SECTION = "/aptitude/problems-on-trains/"
+STAGES = ['fetch', 'parse', 'extract', 'format', 'build', 'insert']
+
+
+def load_deck_builder():
+    """
+    Import deck_builder without running the add-on's __init__ (which needs
+    a running Anki), or return None when anki isn't installed
+    """
+    try:
+        import anki.collection  # noqa: F401
+    except ImportError:
+        return None
+    name = "indiabix_bench"
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [ROOT]
+        sys.modules[name] = package
+    return importlib.import_module(f"{name}.deck_builder")
+
+
+def format_inputs(scraper: IndiaBixScraper, pages: Dict[str, bytes]):
+    """Raw question and explanation text, as parse_question hands it to the formatters"""
+    inputs = []
+    for content in pages.values():
+        for div in scraper.parse_html(content).find_all('div', class_='bix-div-container'):
+            parts = extract_question_parts(div)
+            question = parts['question'].get_text(strip=True) if parts['question'] else ""
+            description = parts['description'] or parts['answer_description']
+            inputs.append((question, description.get_text(strip=True) if description else ""))
+    return inputs
+
+
+class StageTimer:
+    """Times stages of one pipeline run, optionally tracking peak memory"""
+
+    def __init__(self, traced: bool):
+        self.traced = traced
+        self.results: Dict[str, Dict] = {}
+
+    def run(self, name: str, func, nbytes: int = 0):
+        if self.traced:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):  # the scraper logs every page
+            value = func()
+        elapsed = time.perf_counter() - start
+        result = {'seconds': elapsed, 'bytes': nbytes}
+        if self.traced:
+            result['peak'] = tracemalloc.get_traced_memory()[1] - base
+        self.results[name] = result
+        return value
+
+
+def run_pipeline(pages: Dict[str, bytes], inputs, deck_builder, traced: bool) -> Dict[str, Dict]:
+    """One pass over every stage; returns stage -> seconds, bytes and peak"""
+    timer = StageTimer(traced)
+    total_bytes = sum(len(content) for content in pages.values())
+    urls = [BASE_URL + path for path in pages]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, "cache.sqlite3"), max_bytes=1 << 40)
+        for url, content in zip(urls, pages.values()):
+            cache.put(url, content)
+        scraper = IndiaBixScraper(cache=cache, offline=True)
+
+        contents = timer.run('fetch', lambda: [scraper.fetch_content(url) for url in urls], total_bytes)
+        cache._conn.close()
+        soups = timer.run('parse', lambda: [scraper.parse_html(content) for content in contents], total_bytes)
+        del contents
+        questions = timer.run('extract', lambda: [
+            question
+            for page_num, soup in enumerate(soups, 1)
+            for question in scraper.iter_page_questions(soup, page_num)
+        ])
+        del soups
+        timer.run('format', lambda: [
+            (format_question_text(question), format_explanation_text(explanation))
+            for question, explanation in inputs
+        ])
+
+        if deck_builder is not None:
+            from anki.collection import Collection
+            col = Collection(os.path.join(tmp, "bench.anki2"))
+            try:
+                builder = deck_builder.DeckBuilder(col)
+                model = builder.ensure_note_type()
+                deck_id = builder.get_or_create_deck("IndiaBix::Benchmark")
+                notes = timer.run('build', lambda: [
+                    builder.build_note(model, question, tags=["IndiaBix"]) for question in questions
+                ])
+                timer.run('insert', lambda: builder.add_notes(notes, deck_id))
+            finally:
+                col.close()
+
+    for result in timer.results.values():
+        result['items'] = len(questions)
+    return timer.results
+
+
+def measure(size: int, repeat: int, deck_builder) -> Dict[str, Dict]:
+    """Best-of-`repeat` throughput and traced peak memory per stage for one corpus size"""
+    pages = build_section(SECTION, size)
+    inputs = format_inputs(IndiaBixScraper(), pages)
+
+    best: Dict[str, Dict] = {}
+    for _ in range(repeat):
+        for stage, result in run_pipeline(pages, inputs, deck_builder, traced=False).items():
+            if stage not in best or result['seconds'] < best[stage]['seconds']:
+                best[stage] = result
+    if best['extract']['items'] != size:
+        sys.exit(f"Parsed {best['extract']['items']} of {size} generated questions; "
+                 "the corpus and the scraper disagree")
+
+    tracemalloc.start()
+    try:
+        traced = run_pipeline(pages, inputs, deck_builder, traced=True)
+    finally:
+        tracemalloc.stop()
+
+    report = {}
+    for stage in STAGES:
+        if stage not in best:
+            continue
+        result = best[stage]
+        seconds = max(result['seconds'], 1e-9)
+        report[stage] = {
+            'questions_per_sec': round(result['items'] / seconds, 1),
+            'mb_per_sec': round(result['bytes'] / seconds / 1e6, 2) if result['bytes'] else None,
+            'peak_kib': round(traced[stage]['peak'] / 1024, 1),
+        }
+    report['pages'] = len(pages)
+    return report
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'parser': IndiaBixScraper().parser,
+    }
+
+
+def load_baselines() -> Optional[Dict]:
+    try:
+        with open(BASELINES, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare(stage_report: Dict, baseline: Optional[Dict], tolerance: float):
+    """Relative change against the baseline, and whether it counts as a regression"""
+    if not baseline:
+        return "", False
+    speed = stage_report['questions_per_sec'] / max(baseline['questions_per_sec'], 1e-9) - 1
+    memory = stage_report['peak_kib'] / max(baseline['peak_kib'], 1e-9) - 1
+    regressed = speed < -tolerance or memory > tolerance
+    return f"{speed:+6.0%} speed {memory:+6.0%} mem{'  REGRESSION' if regressed else ''}", regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default="5,100,1000,10000",
+                        help="comma-separated question counts (5 is a single page)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per size, best is kept")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINES}")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown / memory growth before flagging (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    deck_builder = load_deck_builder()
+    if deck_builder is None:
+        print("anki is not installed; skipping the build and insert stages")
+
+    env = environment()
+    baselines = load_baselines()
+    if baselines and baselines.get('environment') != env:
+        print(f"Note: baselines were recorded with {baselines.get('environment')}, this is {env}")
+    baseline_sizes = (baselines or {}).get('sizes', {})
+
+    results = {}
+    regressions = 0
+    for size in sizes:
+        report = measure(size, args.repeat, deck_builder)
+        results[str(size)] = report
+        print(f"\n{size} questions ({report['pages']} pages)")
+        print(f"  {'stage':<8} {'questions/s':>12} {'MB/s':>8} {'peak KiB':>10}")
+        for stage in STAGES:
+            if stage not in report:
+                continue
+            row = report[stage]
+            mb = f"{row['mb_per_sec']:.2f}" if row['mb_per_sec'] is not None else "-"
+            delta, regressed = compare(row, baseline_sizes.get(str(size), {}).get(stage), args.tolerance)
+            regressions += regressed
+            print(f"  {stage:<8} {row['questions_per_sec']:>12,.0f} {mb:>8} {row['peak_kib']:>10,.0f}  {delta}")
+
+    if args.save_baseline:
+        merged = dict(baseline_sizes) if baselines and baselines.get('environment') == env else {}
+        merged.update(results)
+        with open(BASELINES, "w", encoding="utf-8") as f:
+            json.dump({'environment': env, 'sizes': merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved baselines to {BASELINES}")
+
+    if regressions:
+        print(f"\n{regressions} stage(s) regressed beyond {args.tolerance:.0%}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
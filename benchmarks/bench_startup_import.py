@@ -0,0 +1,93 @@
+"""
+Benchmark: what loading the add-on costs at Anki startup, before and after
+deferring its imports
+
+Each measurement runs in a fresh interpreter.
+
+    before   the add-on imported its dialogs and the sync at load time,
+             which pulled in the scraper and everything it needs
+    after    loading the add-on registers menus only; 3 s later the startup
+             sync checks the sync history and imports the scraper only if
+             a sync is due
+
+Without aqt only the add-on's Anki-free modules can be imported, so both
+sides are measured with those. With aqt installed (e.g. run with Anki's
+Python), the add-on package itself is also imported both ways, and the
+script lists which of its modules and heavy dependencies got loaded.
+
+Run from the repository root:
+    python benchmarks/bench_startup_import.py [repeats]
+"""
+
+import os
+import sys
+import json
+import subprocess
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)
+
+# Anki-free modules the add-on used to import at load time
+DEFERRED = ['scraper', 'http_cache', 'http_session', 'rate_limiter', 'dedup_index', 'sync_history']
+# What the startup sync timer imports when no sync is due
+STARTUP_CHECK = ['sync_history']
+# Modules the add-on's __init__ used to import (they need aqt)
+EAGER_BEFORE = ['ui', 'auto_sync', 'current_affairs_ui']
+HEAVY = ['bs4', 'lxml', 'requests', 'urllib3', 'sqlite3']
+
+MEASURE = """
+import sys, time, json
+sys.path.insert(0, {path!r})
+{setup}
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = sorted(name for name in sys.modules
+                if name.split('.')[0] in {heavy!r} or name.startswith({prefix!r}))
+print(json.dumps({{'elapsed': elapsed, 'loaded': loaded}}))
+"""
+
+
+def measure(path: str, statement: str, setup: str = "", prefix: str = "\\0", repeats: int = 5):
+    """Median import time in a fresh interpreter, plus the modules it loaded"""
+    code = MEASURE.format(path=path, setup=setup, statement=statement, heavy=HEAVY, prefix=prefix)
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return median(run['elapsed'] for run in runs), runs[-1]['loaded']
+
+
+def report(label: str, elapsed: float, loaded):
+    top_level = [name for name in loaded if '.' not in name]
+    print(f"  {label:<34} {elapsed * 1000:7.1f} ms   loads: {', '.join(top_level) or 'nothing'}")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("Anki-free add-on modules imported at startup")
+    report("before (all at load time)", *measure(ROOT, "import " + ", ".join(DEFERRED), repeats=repeats))
+    report("after, at load time", 0.0, [])
+    report("after, startup sync not due", *measure(ROOT, "import " + ", ".join(STARTUP_CHECK), repeats=repeats))
+
+    try:
+        subprocess.run([sys.executable, "-c", "import aqt"], capture_output=True, check=True)
+    except subprocess.CalledProcessError:
+        print("aqt is not installed; run with Anki's Python to compare the add-on package itself")
+        return
+
+    before = f"import {PACKAGE}; " + "; ".join(f"import {PACKAGE}.{name}" for name in EAGER_BEFORE)
+    print("\nAdd-on package import (after aqt)")
+    for label, statement in (("before (dialogs and sync eager)", before),
+                             ("after", f"import {PACKAGE}")):
+        elapsed, loaded = measure(os.path.dirname(ROOT), statement, setup="import aqt",
+                                  prefix=PACKAGE + ".", repeats=repeats)
+        eager = [name for name in loaded if name.startswith(PACKAGE + ".") or name.split('.')[0] in HEAVY]
+        print(f"  {label:<34} {elapsed * 1000:7.1f} ms   modules: {', '.join(eager) or 'none beyond the package'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Synthetic IndiaBix pages for offline benchmarks
+
+Generates section pages with the markup the scraper reads (bix-div-container,
+bix-td-qtxt, bix-opt-row, option-svg-letter-*, answer descriptions), mixing
+plain text, image, code and old-style questions, wrapped in the navigation,
+scripts and ads a real page carries. Output is deterministic for a seed, so
+runs at the same size parse exactly the same bytes.
+
+    from corpus import build_section
+    pages = build_section("/aptitude/problems-on-trains/", 10_000)
+"""
+
+import random
+from typing import Dict, List, Tuple
+
+BASE_URL = "https://www.indiabix.com"
+
+# IndiaBix shows five questions per section page and links to a window of
+# neighbouring pages
+QUESTIONS_PER_PAGE = 5
+PAGINATION_WINDOW = 10
+
+WORDS = (
+    "train length speed platform crosses seconds metres pole bridge time "
+    "man running direction opposite same km hr express goods passenger "
+    "station distance minutes faster slower overtakes tunnel relative"
+).split()
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} - IndiaBix</title>
+<link rel="stylesheet" href="/_files/css/bix.min.css">
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+</head><body>
+<div class="bix-header"><nav><ul>{nav}</ul></nav></div>
+<div class="ads-top"><script async src="/_files/js/ads.js"></script><ins class="adsbygoogle"></ins></div>
+<div class="bix-main"><h1>{title}</h1>
+"""
+
+PAGE_TAIL = """</div>
+<div class="bix-sidebar"><ul>{nav}</ul><div class="ads-side"><ins class="adsbygoogle"></ins></div></div>
+<div class="bix-footer"><p>&copy; IndiaBix Technologies</p><script src="/_files/js/bix.min.js"></script></div>
+</body></html>"""
+
+NAV = "".join(f'<li><a href="/aptitude/topic-{i}/">Topic {i}</a></li>' for i in range(40))
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _options(rng: random.Random, count: int) -> List[str]:
+    return [str(rng.randint(10, 999)) + " " + rng.choice(WORDS) for _ in range(count)]
+
+
+def _option_rows(letters: str, values: List[str]) -> str:
+    return "".join(
+        f'<div class="bix-opt-row"><div class="bix-td-option"><span class="option-svg-letter-{letter}"></span></div>'
+        f'<div class="bix-td-option-val">{value}</div></div>'
+        for letter, value in zip(letters, values)
+    )
+
+
+def text_question(rng: random.Random, n: int) -> str:
+    """Word problem with the answer encoded in the answer block's class name"""
+    answer = rng.choice("abcd")
+    steps = ".".join(f"Step {i}:{_sentence(rng, 6, 14).capitalize()}" for i in range(1, rng.randint(2, 4)))
+    return f"""<div class="bix-div-container">
+  <div class="bix-td-qno">{n}.</div>
+  <div class="bix-td-qtxt">{_sentence(rng, 12, 30).capitalize()}?<script>track({n})</script></div>
+  {_option_rows("abcd", _options(rng, 4))}
+  <div class="bix-ans-option"><span class="x option-svg-letter-{answer}"></span></div>
+  <div class="bix-ans-description">{steps}.Hence the answer is {answer.upper()}.</div>
+</div>"""
+
+
+def image_question(rng: random.Random, n: int) -> str:
+    """Figure question with images in the options and the explanation"""
+    answer = rng.choice("abcde")
+    images = [f'<img src="/_files/images/figures/{n}-{letter}.png">' for letter in "ab"]
+    return f"""<div class="bix-div-container">
+  <div class="bix-td-qtxt">Choose the figure which completes the series {n}.<img src="/_files/images/figures/q{n}.png"><style>.x{{}}</style></div>
+  {_option_rows("abcde", images + ["C", "D", "E"])}
+  <div class="bix-ans-option"><span class="option-svg-letter-{answer}"></span></div>
+  <div class="bix-div-answer-description">{_sentence(rng, 5, 12).capitalize()}.<img src="/_files/images/figures/e{n}.png"></div>
+</div>"""
+
+
+def code_question(rng: random.Random, n: int) -> str:
+    """C program question; the answer is only in the answer block's text"""
+    value = rng.randint(1, 99)
+    return f"""<div class="bix-div-container">
+  <div class="bix-td-qtxt">What will be the output of the program?#include &lt;stdio.h&gt;int main() {{ int i = {value}; i = i * 2; printf("%d", i); return 0; }}</div>
+  {_option_rows("abcd", [str(value), str(value * 2), "Error", "Garbage value"])}
+  <div class="bix-ans-option">Answer: Option B</div>
+  <div class="bix-ans-description">i is doubled to {value * 2} before printf runs.Hence B.</div>
+</div>"""
+
+
+def old_style_question(rng: random.Random, n: int) -> str:
+    """Old markup: plain option rows and the hidden answer span"""
+    return f"""<div class="bix-div-container">
+  <div class="bix-td-qtxt">{_sentence(rng, 8, 16).capitalize()}?</div>
+  <div class="bix-opt-row">Yes</div><div class="bix-opt-row">No</div>
+  <span class="jq-hdnakqb">{rng.choice("AB")}</span>
+</div>"""
+
+
+# Rough mix of a quantitative aptitude / programming section
+QUESTION_KINDS = [
+    (text_question, 6),
+    (image_question, 2),
+    (code_question, 1),
+    (old_style_question, 1),
+]
+
+
+def page_path(section_path: str, page: int, section_id: int = 6) -> str:
+    """
+    URL path of a section page: the first page is the section itself, later
+    ones use the 6-digit scheme (3-digit section id, 3-digit page). Pages
+    past 999 carry over into the next section id so the number stays 6 digits.
+    """
+    if page == 1:
+        return section_path
+    return f"{section_path.rstrip('/')}/{section_id + page // 1000:03d}{page % 1000:03d}"
+
+
+def build_page(questions: List[str], title: str, pagination: List[Tuple[int, str]]) -> bytes:
+    """Wrap question containers in a full page with navigation and (page, path) pagination links"""
+    links = "".join(f'<a class="page-link" href="{href}">{page}</a>' for page, href in pagination)
+    return (PAGE_HEAD.format(title=title, nav=NAV)
+            + "\n".join(questions)
+            + f'<div class="bix-pagination">{links}</div>'
+            + PAGE_TAIL.format(nav=NAV)).encode("utf-8")
+
+
+def generate_questions(count: int, seed: int = 0, start: int = 1) -> List[str]:
+    """Question container markup for `count` questions"""
+    rng = random.Random(seed)
+    kinds = [kind for kind, weight in QUESTION_KINDS for _ in range(weight)]
+    return [rng.choice(kinds)(rng, n) for n in range(start, start + count)]
+
+
+def build_section(section_path: str, questions: int, per_page: int = QUESTIONS_PER_PAGE,
+                  seed: int = 0, section_id: int = 6,
+                  window: int = PAGINATION_WINDOW) -> Dict[str, bytes]:
+    """
+    Generate every page of a section
+
+    Args:
+        section_path: URL path of the section, e.g. "/aptitude/problems-on-trains/"
+        questions: Total number of questions across all pages
+        per_page: Questions on each page
+        seed: Seed for the question text
+        section_id: First three digits of the 6-digit page numbers
+        window: Number of pages each page's pagination links to
+
+    Returns:
+        Dict mapping URL path to page HTML, in page order
+    """
+    page_count = max(1, -(-questions // per_page))
+    links = [(page, page_path(section_path, page, section_id)) for page in range(1, page_count + 1)]
+    blocks = generate_questions(questions, seed)
+    title = section_path.strip("/").replace("/", " - ").replace("-", " ").title()
+
+    pages = {}
+    for index, (_, path) in enumerate(links):
+        first = max(0, min(index - window // 2, page_count - window))
+        pages[path] = build_page(blocks[index * per_page:(index + 1) * per_page], title,
+                                 links[first:first + window])
+    return pages
@@ -0,0 +1,323 @@
+"""
+Local stand-in for indiabix.com, for load and concurrency testing
+
+Serves generated pages (see corpus.py) over HTTP/1.1 with keep-alive:
+
+    /<category>/<topic>/                 first page of a section
+    /<category>/<topic>/NNNNNN           later pages (6-digit pagination)
+    /current-affairs/YYYY/MM/            month index linking each published day
+    /current-affairs/YYYY-MM-DD/         one day's questions (404 if not published)
+
+Faults can be injected per request: fixed latency plus jitter, 429
+responses with Retry-After, 503 responses, and dropped connections. Every
+page has an ETag and Last-Modified, and conditional requests get 304.
+
+Point the add-on at it with the 'base_url' config option, or pass base_url
+to IndiaBixScraper / CurrentAffairsAutoSync:
+
+    python benchmarks/mock_indiabix.py --port 8765 --latency 0.05 --jitter 0.02 --throttle-rate 0.05
+
+    with MockIndiaBixServer(faults=Faults(latency=0.02)) as server:
+        IndiaBixScraper(base_url=server.base_url).scrape_section(server.url("/aptitude/numbers/"))
+"""
+
+import re
+import sys
+import time
+import random
+import socket
+import hashlib
+import argparse
+import threading
+from datetime import date, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+
+from corpus import QUESTIONS_PER_PAGE, PAGINATION_WINDOW, build_page, build_section, generate_questions
+
+SECTION_RE = re.compile(r'^(/[a-z0-9-]+/[a-z0-9-]+/)(\d{6})?$')
+DAY_RE = re.compile(r'^/current-affairs/(\d{4})-(\d{2})-(\d{2})/?$')
+MONTH_RE = re.compile(r'^/current-affairs/(\d{4})/(\d{2})/?$')
+
+# Served as every page's Last-Modified
+LAST_MODIFIED = formatdate(1_700_000_000, usegmt=True)
+
+
+class Faults:
+    """
+    What can go wrong with a request, drawn independently per request
+
+    Args:
+        latency: Seconds added before every response
+        jitter: Random +/- seconds around the latency
+        throttle_rate: Share of requests answered 429 with Retry-After
+        retry_after: Retry-After seconds sent with 429 responses
+        unavailable_rate: Share of requests answered 503
+        drop_rate: Share of requests whose connection is closed without a response
+        seed: Seed for the fault draws, for repeatable runs
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: int = 1, unavailable_rate: float = 0.0, drop_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.unavailable_rate = unavailable_rate
+        self.drop_rate = drop_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[str]]:
+        """Delay for one request and the fault to inject ('drop', 429, 503 or None)"""
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            roll = self._rng.random()
+        if roll < self.drop_rate:
+            return delay, 'drop'
+        roll -= self.drop_rate
+        if roll < self.throttle_rate:
+            return delay, 429
+        roll -= self.throttle_rate
+        if roll < self.unavailable_rate:
+            return delay, 503
+        return delay, None
+
+
+class MockIndiaBixServer:
+    """
+    Threaded HTTP server generating IndiaBix-like pages on demand
+
+    Args:
+        host, port: Address to listen on (port 0 picks a free port)
+        faults: Faults to inject, none by default
+        section_questions: Questions in every section
+        current_affairs_questions: Questions on every published day
+        skip_weekdays: Weekdays (0 = Monday) with no Current Affairs page
+        today: Last published day (default: the real today)
+        pagination_window: Pages each section page links to
+        etags: Send ETag/Last-Modified and answer conditional requests with 304
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Optional[Faults] = None,
+                 section_questions: int = 100, current_affairs_questions: int = 10,
+                 skip_weekdays: Sequence[int] = (6,), today: Optional[date] = None,
+                 pagination_window: int = PAGINATION_WINDOW, etags: bool = True):
+        self.faults = faults or Faults()
+        self.section_questions = section_questions
+        self.current_affairs_questions = current_affairs_questions
+        self.skip_weekdays = set(skip_weekdays)
+        self.today = today
+        self.pagination_window = pagination_window
+        self.etags = etags
+
+        self._sections: Dict[str, Dict[str, bytes]] = {}
+        self._sections_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def start(self) -> 'MockIndiaBixServer':
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-indiabix", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'MockIndiaBixServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Statistics
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {'requests': 0, 'bytes': 0, 'dropped': 0, 'in_flight': 0,
+                           'max_in_flight': 0, 'statuses': {}}
+
+    def stats(self) -> Dict:
+        """Snapshot of request counts: totals, per status, dropped, peak concurrency"""
+        with self._stats_lock:
+            return dict(self._stats, statuses=dict(self._stats['statuses']))
+
+    def _request_started(self):
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['in_flight'] += 1
+            self._stats['max_in_flight'] = max(self._stats['max_in_flight'], self._stats['in_flight'])
+
+    def _request_finished(self, status: Optional[int], size: int = 0):
+        with self._stats_lock:
+            self._stats['in_flight'] -= 1
+            if status is None:
+                self._stats['dropped'] += 1
+            else:
+                statuses = self._stats['statuses']
+                statuses[status] = statuses.get(status, 0) + 1
+                self._stats['bytes'] += size
+
+    # Content
+
+    def published(self, day: date) -> bool:
+        """Whether a Current Affairs page exists for a day"""
+        return day <= (self.today or date.today()) and day.weekday() not in self.skip_weekdays
+
+    def page(self, path: str) -> Optional[bytes]:
+        """Body for a path, or None for 404"""
+        match = DAY_RE.match(path)
+        if match:
+            try:
+                day = date(*map(int, match.groups()))
+            except ValueError:
+                return None
+            if not self.published(day):
+                return None
+            questions = generate_questions(self.current_affairs_questions, seed=day.toordinal())
+            return build_page(questions, f"Current Affairs {day.isoformat()}", [])
+
+        match = MONTH_RE.match(path)
+        if match:
+            year, month = map(int, match.groups())
+            if not 1 <= month <= 12:
+                return None
+            day = date(year, month, 1)
+            links = []
+            while day.month == month:
+                if self.published(day):
+                    links.append(f'<li><a href="/current-affairs/{day.isoformat()}/">{day:%d %B %Y}</a></li>')
+                day += timedelta(days=1)
+            body = f"<html><body><h1>Current Affairs {year}-{month:02d}</h1><ul>{''.join(links)}</ul></body></html>"
+            return body.encode("utf-8")
+
+        match = SECTION_RE.match(path)
+        if match:
+            section = match.group(1)
+            with self._sections_lock:
+                pages = self._sections.get(section)
+                if pages is None:
+                    seed = int(hashlib.sha1(section.encode()).hexdigest()[:8], 16)
+                    pages = self._sections[section] = build_section(
+                        section, self.section_questions, QUESTIONS_PER_PAGE, seed=seed,
+                        window=self.pagination_window
+                    )
+            return pages.get(path)
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockIndiaBix/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mock: MockIndiaBixServer = self.server.mock
+        mock._request_started()
+        status, size = None, 0
+        try:
+            delay, fault = mock.faults.draw()
+            if delay:
+                time.sleep(delay)
+
+            if fault == 'drop':
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            if fault == 429:
+                status = self._send(429, b"Too Many Requests", {'Retry-After': str(mock.faults.retry_after)})
+                return
+            if fault == 503:
+                status = self._send(503, b"Service Unavailable")
+                return
+
+            body = mock.page(self.path.split('?', 1)[0])
+            if body is None:
+                status = self._send(404, b"Not Found")
+                return
+
+            headers = {}
+            if mock.etags:
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                headers = {'ETag': etag, 'Last-Modified': LAST_MODIFIED}
+                if (self.headers.get('If-None-Match') == etag
+                        or self.headers.get('If-Modified-Since') == LAST_MODIFIED):
+                    status = self._send(304, b"", headers)
+                    return
+            status = self._send(200, body, headers)
+            size = len(body)
+        except OSError:
+            status = None  # client went away
+        finally:
+            mock._request_finished(status, size)
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> int:
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve generated IndiaBix pages locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- seconds around the latency")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument("--unavailable-rate", type=float, default=0.0, help="share of requests answered 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of connections dropped")
+    parser.add_argument("--section-questions", type=int, default=100)
+    parser.add_argument("--current-affairs-questions", type=int, default=10)
+    parser.add_argument("--pagination-window", type=int, default=PAGINATION_WINDOW)
+    parser.add_argument("--no-etags", action="store_true", help="never answer 304")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.throttle_rate, args.retry_after,
+                    args.unavailable_rate, args.drop_rate, args.seed)
+    server = MockIndiaBixServer(args.host, args.port, faults, args.section_questions,
+                                args.current_affairs_questions, pagination_window=args.pagination_window,
+                                etags=not args.no_etags)
+    print(f"Serving mock IndiaBix at {server.base_url} (set the add-on's 'base_url' to this)")
+    print(f"  e.g. {server.url('/aptitude/problems-on-trains/')}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"\n{server.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
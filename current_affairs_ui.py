@@ -147,6 +147,11 @@ class CurrentAffairsDialog(QDialog):
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.log_text.append(f"[{timestamp}] {message}")
     
+    def log_trace(self):
+        """Add the last sync's stage timings to the log ('trace_stages' option)"""
+        for line in self.syncer.last_trace:
+            self.log(f"⏱ {line}")
+    
     def toggle_auto_sync(self, state):
         """Toggle auto-sync setting"""
         enabled = state == Qt.CheckState.Checked
@@ -160,8 +165,9 @@ class CurrentAffairsDialog(QDialog):
         self.log("Starting manual sync...")
         
         try:
-            self.syncer.auto_sync(show_notifications=False)
+            self.syncer.auto_sync(show_notifications=False, force=True)
             self.log("✅ Sync completed")
+            self.log_trace()
             self.update_status()
         except Exception as e:
             self.log(f"❌ Error: {str(e)}")
@@ -203,6 +209,7 @@ class CurrentAffairsDialog(QDialog):
             
             self.log(f"✅ Completed: {stats['synced']} synced, "
                     f"{stats['skipped']} skipped, {stats['failed']} failed")
+            self.log_trace()
             self.update_status()
             
             tooltip(f"Sync complete! {stats['synced']} new days added.", period=3000)
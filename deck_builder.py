@@ -3,17 +3,87 @@ IndiaBix Flashcard Generator - Deck Builder Module
 Handles Anki API integration for creating flashcards
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
 from anki.collection import Collection
 from anki.notes import Note
+import re
 import time
+import hashlib
+import unicodedata
+
+from .dedup_index import signature, note_text, has_images
+from .note_type import NoteTypeManager
+from .tracing import NULL_TRACER
+
+try:
+    from anki.collection import AddNoteRequest
+except ImportError:  # Anki < 2.1.55
+    AddNoteRequest = None
+
+
+# SQLite allows at most 999 bound parameters per statement
+GUID_LOOKUP_CHUNK = 500
+
+# Added to new notes that closely match a note already in the collection
+NEAR_DUPLICATE_TAG = 'IndiaBix::NearDuplicate'
+
+_IMG_SRC_RE = re.compile(r'''<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']''', re.I)
+
+
+def question_guid(question_data: Dict) -> str:
+    """
+    Derive a stable note GUID for a scraped question
+    
+    Built from the section URL plus the question stem, its images and the
+    options, so a re-scrape of the same section maps onto the same notes
+    while corrected answers or explanations are treated as updates.
+    Figure questions share their stem ("Choose the figure which completes
+    the series.") and have image-only options, so the paths of the images
+    in the question are what tells them apart.
+    
+    The URL is reduced to its path without a trailing slash, so the same
+    section pasted with or without the slash, a query string or another
+    host gives the same GUIDs; image paths likewise ignore the host.
+    """
+    options = question_data.get('options', {})
+    images = [urlparse(src).path for src in
+              _IMG_SRC_RE.findall(question_data.get('question_html') or '')]
+    key = '\x1f'.join([
+        urlparse(question_data.get('source_url', '')).path.rstrip('/'),
+        question_data.get('question', ''),
+        *images,
+        *(f"{label}={options[label]}" for label in sorted(options)),
+    ])
+    digest = hashlib.sha1(unicodedata.normalize('NFC', key).encode('utf-8')).hexdigest()
+    return f"ibx{digest[:20]}"
 
 
 class DeckBuilder:
     """Build Anki decks from scraped questions"""
     
-    def __init__(self, collection: Collection):
+    def __init__(self, collection: Collection, duplicate_index=None,
+                 skip_duplicates: bool = False, tracer=None, sync_index: bool = True):
+        """
+        Args:
+            collection: The Anki collection to write to
+            duplicate_index: Optional DuplicateIndex used to catch reworded
+                repeats of questions already in the collection
+            skip_duplicates: Skip near-duplicates instead of tagging them
+            sync_index: Sync duplicate_index with the collection before
+                each import; callers on the main thread pass False and
+                sync it in the background instead
+            tracer: Optional tracing.Tracer receiving build, lookup, dedup,
+                insert and update spans from add_questions_batch
+        """
         self.col = collection
+        self.note_types = NoteTypeManager(collection)
+        self.duplicate_index = duplicate_index
+        self.skip_duplicates = skip_duplicates
+        self.sync_index = sync_index
+        self.tracer = tracer or NULL_TRACER
+        self.last_stats = {'added': 0, 'updated': 0, 'unchanged': 0,
+                           'duplicates': 0, 'failed': 0}
     
     def get_or_create_deck(self, deck_name: str) -> int:
         """Get existing deck or create a new one"""
@@ -22,141 +92,10 @@ class DeckBuilder:
     
     def ensure_note_type(self) -> dict:
         """
-        Ensure the IndiaBix note type exists, create if necessary
+        Ensure the IndiaBix note type exists and is up to date
         Returns the note type (model)
         """
-        model_name = "IndiaBix MCQ"
-        
-        # Check if model already exists
-        existing_model = self.col.models.by_name(model_name)
-        if existing_model:
-            return existing_model
-        
-        # Create new note type
-        model = self.col.models.new(model_name)
-        
-        # Add fields
-        self.col.models.add_field(model, self.col.models.new_field("Question"))
-        self.col.models.add_field(model, self.col.models.new_field("Options"))
-        self.col.models.add_field(model, self.col.models.new_field("Answer"))
-        self.col.models.add_field(model, self.col.models.new_field("Explanation"))
-        
-        # Add card template
-        template = self.col.models.new_template("Card 1")
-        
-        # Front template
-        template['qfmt'] = """
-<div class="question">
-    <h3>Question:</h3>
-    {{Question}}
-</div>
-
-<div class="options">
-    <h4>Options:</h4>
-    {{Options}}
-</div>
-"""
-        
-        # Back template
-        template['afmt'] = """
-{{FrontSide}}
-
-<hr id="answer">
-
-<div class="answer">
-    <h3 style="color: green;">Correct Answer:</h3>
-    <strong>{{Answer}}</strong>
-</div>
-
-{{#Explanation}}
-<div class="explanation">
-    <h4>Explanation:</h4>
-    {{Explanation}}
-</div>
-{{/Explanation}}
-"""
-        
-        self.col.models.add_template(model, template)
-        
-        # Add styling
-        model['css'] = """
-.card {
-    font-family: Arial, sans-serif;
-    font-size: 16px;
-    text-align: left;
-    color: #000; /* Changed from #333 to pure black */
-    background-color: #fff;
-    padding: 20px;
-}
-
-/* Ensure all nested text is black */
-.card * {
-    color: #000 !important;
-}
-
-.question {
-    margin-bottom: 20px;
-    padding: 15px;
-    background-color: #f0f8ff;
-    border-left: 4px solid #2196F3;
-    border-radius: 4px;
-}
-
-.question h3 {
-    margin-top: 0;
-    color: #000; /* Make heading black */
-}
-
-.options {
-    margin-bottom: 20px;
-    padding: 15px;
-    background-color: #f9f9f9;
-    border-radius: 4px;
-}
-
-.options h4 {
-    margin-top: 0;
-    color: #000; /* Make heading black */
-}
-
-.answer {
-    padding: 15px;
-    background-color: #e8f5e9;
-    border-left: 4px solid #4CAF50;
-    border-radius: 4px;
-    margin-bottom: 20px;
-}
-
-.explanation {
-    padding: 15px;
-    background-color: #fff3e0;
-    border-left: 4px solid #FF9800;
-    border-radius: 4px;
-    margin-top: 20px;
-}
-
-.explanation h4 {
-    margin-top: 0;
-    color: #000; /* Make heading black */
-}
-
-strong {
-    font-size: 18px;
-    color: #000; /* Ensure bold text is black */
-}
-
-hr {
-    border: none;
-    border-top: 2px solid #e0e0e0;
-    margin: 20px 0;
-}
-"""
-        
-        # Save the model
-        self.col.models.add(model)
-        self.col.models.save(model)
-        
-        return model
+        return self.note_types.get()
     
     def format_options(self, options: Dict[str, str]) -> str:
         """Format options dictionary into HTML"""
@@ -170,34 +109,25 @@ hr {
         
         return "<br>".join(html_parts)
     
-    def add_question(self, 
-                    deck_name: str, 
-                    question_data: Dict,
-                    tags: Optional[List[str]] = None,
-                    include_explanation: bool = True) -> Note:
+    def build_note(self,
+                   model: dict,
+                   question_data: Dict,
+                   tags: Optional[List[str]] = None,
+                   include_explanation: bool = True) -> Note:
         """
-        Add a single question as a flashcard
+        Build an unsaved note for a question
         
         Args:
-            deck_name: Name of the target deck
+            model: The IndiaBix note type from ensure_note_type()
             question_data: Dictionary with 'question', 'options', 'answer', 'explanation'
             tags: List of tags to add to the card
             include_explanation: Whether to include explanation on the back
         
         Returns:
-            The created Note object
+            A Note that hasn't been added to the collection yet
         """
-        # Get deck
-        deck_id = self.get_or_create_deck(deck_name)
-        
-        # Ensure note type exists
-        model = self.ensure_note_type()
-        
-        # Create note
         note = Note(self.col, model)
-        
-        # Set deck
-        note.note_type()['did'] = deck_id
+        note.guid = question_guid(question_data)
         
         # Fill in fields - use HTML version if images present
         if question_data.get('has_images') and question_data.get('question_html'):
@@ -255,53 +185,255 @@ hr {
         
         # Add tags
         if tags:
-            note.tags = tags
+            note.tags = list(tags)
+        
+        return note
+    
+    def add_question(self, 
+                    deck_name: str, 
+                    question_data: Dict,
+                    tags: Optional[List[str]] = None,
+                    include_explanation: bool = True) -> Note:
+        """
+        Add a single question as a flashcard
+        
+        Args:
+            deck_name: Name of the target deck
+            question_data: Dictionary with 'question', 'options', 'answer', 'explanation'
+            tags: List of tags to add to the card
+            include_explanation: Whether to include explanation on the back
+        
+        Returns:
+            The created Note object
+        """
+        # Get deck
+        deck_id = self.get_or_create_deck(deck_name)
+        
+        # Ensure note type exists
+        model = self.ensure_note_type()
+        
+        # Set deck
+        model['did'] = deck_id
+        
+        note = self.build_note(model, question_data, tags, include_explanation)
         
         # Add note to collection
         self.col.add_note(note, deck_id)
         
         return note
     
+    def add_notes(self, notes: List[Note], deck_id: int) -> int:
+        """
+        Insert notes into a deck with one backend call
+        
+        Uses the collection's batch add_notes API where available (one
+        transaction for the whole list). If the batch fails, the notes are
+        added one by one so a single bad note doesn't lose the rest.
+        
+        Returns:
+            Number of notes added
+        """
+        if not notes:
+            return 0
+        
+        if AddNoteRequest is not None and hasattr(self.col, 'add_notes'):
+            try:
+                self.col.add_notes([AddNoteRequest(note=note, deck_id=deck_id) for note in notes])
+                return len(notes)
+            except Exception as e:
+                print(f"Batch insert failed, adding notes individually: {str(e)}")
+        
+        added = 0
+        for note in notes:
+            try:
+                self.col.add_note(note, deck_id)
+                added += 1
+            except Exception as e:
+                print(f"Error adding note: {str(e)}")
+        return added
+    
+    def find_existing_notes(self, guids: List[str]) -> Dict[str, Tuple[int, int, str, str]]:
+        """
+        Look up notes by GUID with one query per GUID_LOOKUP_CHUNK GUIDs
+        
+        Returns:
+            Dict mapping guid to (note id, note type id, fields, tags)
+        """
+        found = {}
+        unique = list(dict.fromkeys(guids))
+        for start in range(0, len(unique), GUID_LOOKUP_CHUNK):
+            chunk = unique[start:start + GUID_LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.col.db.all(
+                f"select guid, id, mid, flds, tags from notes where guid in ({placeholders})",
+                *chunk
+            )
+            for guid, nid, mid, flds, tags in rows:
+                found[guid] = (nid, mid, flds, tags)
+        return found
+    
+    def update_notes(self, notes: List[Note]) -> int:
+        """Write changed notes back with one backend call where supported"""
+        if not notes:
+            return 0
+        if hasattr(self.col, 'update_notes'):
+            try:
+                self.col.update_notes(notes)
+                return len(notes)
+            except Exception as e:
+                print(f"Batch update failed, updating notes individually: {str(e)}")
+        
+        updated = 0
+        for note in notes:
+            try:
+                self.col.update_note(note)
+                updated += 1
+            except Exception as e:
+                print(f"Error updating note: {str(e)}")
+        return updated
+    
+    def _merge_existing(self, note: Note, existing: Tuple[int, int, str, str],
+                        model: dict) -> Optional[Note]:
+        """
+        Compare a freshly built note with the stored one
+        
+        Returns the stored note with updated fields/tags if anything changed,
+        or None if it is already up to date (or belongs to another note type).
+        """
+        nid, mid, flds, tags = existing
+        if mid != model['id']:
+            return None
+        
+        new_flds = unicodedata.normalize('NFC', '\x1f'.join(note.fields))
+        old_tags = set(tags.split())
+        if new_flds == unicodedata.normalize('NFC', flds) and old_tags.issuperset(note.tags):
+            return None
+        
+        stored = self.col.get_note(nid)
+        for i, value in enumerate(note.fields):
+            stored.fields[i] = value
+        # Keep any tags the user added, add ours
+        stored.tags = sorted(old_tags.union(note.tags))
+        return stored
+    
+    def _filter_near_duplicates(self, notes: List[Note], stats: Dict) -> List[Note]:
+        """
+        Check new notes against the near-duplicate index
+        
+        Matches are tagged with NEAR_DUPLICATE_TAG, or dropped when
+        skip_duplicates is set. Kept notes are indexed right away so repeats
+        within the same import are caught too. Questions with images aren't
+        checked (see has_images).
+        """
+        if self.duplicate_index is None:
+            return notes
+        
+        kept = []
+        for note in notes:
+            sig = signature(note_text(note.fields))
+            if has_images(note.fields):
+                self.duplicate_index.add(note.guid, sig, commit=False, bucketed=False)
+                kept.append(note)
+                continue
+            if self.duplicate_index.find(sig, exclude_guid=note.guid):
+                stats['duplicates'] += 1
+                if self.skip_duplicates:
+                    continue
+                note.tags.append(NEAR_DUPLICATE_TAG)
+            # Note id and mod are filled in by the next sync()
+            self.duplicate_index.add(note.guid, sig, commit=False)
+            kept.append(note)
+        self.duplicate_index.commit()
+        return kept
+    
     def add_questions_batch(self,
                            deck_name: str,
                            questions: List[Dict],
                            tags: Optional[List[str]] = None,
                            include_explanation: bool = True,
-                           progress_callback=None) -> int:
+                           progress_callback=None,
+                           batch_size: int = 50) -> int:
         """
         Add multiple questions as flashcards
         
+        The deck and note type are resolved once, then notes are built in
+        memory and inserted batch_size at a time with add_notes().
+        
+        Every note gets a GUID derived from its question (see question_guid),
+        so re-importing a section upserts: unchanged notes are skipped without
+        a write, changed ones are updated in place (keeping review history),
+        and only new questions are added. Counts are left in self.last_stats.
+        
+        With a duplicate_index, new questions that closely match an existing
+        note (e.g. the same question reworded in another section) are tagged
+        or skipped.
+        
         Args:
             deck_name: Name of the target deck
             questions: List of question dictionaries
             tags: List of tags to add to all cards
             include_explanation: Whether to include explanations
             progress_callback: Optional callback function(current, total)
+            batch_size: Number of notes inserted per backend call
         
         Returns:
             Number of cards successfully added
         """
-        added = 0
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'failed': 0}
+        self.last_stats = stats
         total = len(questions)
+        batch_size = max(1, int(batch_size or 1))
+        seen_guids = set()
         
-        for i, question_data in enumerate(questions):
-            try:
-                self.add_question(
-                    deck_name=deck_name,
-                    question_data=question_data,
-                    tags=tags,
-                    include_explanation=include_explanation
-                )
-                added += 1
-                
-                if progress_callback:
-                    progress_callback(i + 1, total)
-                    
-            except Exception as e:
-                print(f"Error adding question {i+1}: {str(e)}")
-                continue
+        deck_id = self.get_or_create_deck(deck_name)
+        model = self.ensure_note_type()
+        model['did'] = deck_id
         
-        return added
+        tracer = self.tracer
+        if self.duplicate_index is not None and self.sync_index:
+            with tracer.span('dedup', phase='sync'):
+                self.duplicate_index.sync(self.col, model['id'])
+        
+        for start in range(0, total, batch_size):
+            notes = []
+            for i, question_data in enumerate(questions[start:start + batch_size], start):
+                try:
+                    with tracer.span('build'):
+                        notes.append(self.build_note(model, question_data, tags, include_explanation))
+                except Exception as e:
+                    print(f"Error adding question {i+1}: {str(e)}")
+                    stats['failed'] += 1
+            
+            with tracer.span('lookup', notes=len(notes)):
+                existing = self.find_existing_notes([note.guid for note in notes])
+            new_notes, changed_notes = [], []
+            for note in notes:
+                if note.guid in existing:
+                    stored = self._merge_existing(note, existing[note.guid], model)
+                    if stored is not None:
+                        changed_notes.append(stored)
+                    else:
+                        stats['unchanged'] += 1
+                elif note.guid in seen_guids:
+                    stats['unchanged'] += 1  # Same question twice in one import
+                else:
+                    new_notes.append(note)
+                seen_guids.add(note.guid)
+            
+            with tracer.span('dedup', notes=len(new_notes)):
+                new_notes = self._filter_near_duplicates(new_notes, stats)
+            with tracer.span('insert', notes=len(new_notes)):
+                added = self.add_notes(new_notes, deck_id)
+            with tracer.span('update', notes=len(changed_notes)):
+                updated = self.update_notes(changed_notes)
+            stats['added'] += added
+            stats['updated'] += updated
+            stats['failed'] += (len(new_notes) - added) + (len(changed_notes) - updated)
+            
+            if progress_callback:
+                progress_callback(min(start + batch_size, total), total)
+        
+        return stats['added']
     
     def get_deck_stats(self, deck_name: str) -> Dict:
         """Get statistics for a deck"""
@@ -0,0 +1,318 @@
+"""
+Near-Duplicate Index Module
+MinHash/LSH similarity index over "IndiaBix MCQ" notes, stored next to the add-on
+"""
+
+import os
+import re
+import html
+import zlib
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 21 bands of 6 rows: pairs at 0.7 similarity share a bucket ~93% of the
+# time, unrelated questions (~0.15) almost never
+NUM_HASHES = 128
+BANDS = 21
+ROWS_PER_BAND = 6
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.7
+
+_BIN_BITS = 7  # 2 ** 7 == NUM_HASHES bins
+_VALUE_MASK = (1 << (32 - _BIN_BITS)) - 1
+_EMPTY = _VALUE_MASK + 1
+_TAG_RE = re.compile(r'<[^>]+>')
+_IMG_RE = re.compile(r'<img\b', re.I)
+_WORD_RE = re.compile(r'\w+')
+
+# SQLite allows at most 999 bound parameters per statement
+_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Reduce note HTML or scraped text to lowercase words separated by spaces"""
+    text = html.unescape(_TAG_RE.sub(' ', text))
+    return ' '.join(_WORD_RE.findall(text.casefold()))
+
+
+def signature(text: str) -> array:
+    """
+    MinHash signature of a text's 5-byte shingles
+
+    Uses one-permutation hashing: every shingle is hashed once and lands in
+    one of NUM_HASHES bins, each bin keeping its minimum. Empty bins borrow
+    from the next non-empty bin (rotation densification), so the signature
+    stays comparable position by position. This costs one hash per shingle
+    instead of one per shingle per permutation.
+
+    Only the low 16 bits of each minimum are kept (b-bit MinHash), which
+    keeps the signature at 256 bytes while barely affecting the estimate.
+    """
+    data = normalize_text(text).encode('utf-8')
+    if len(data) <= SHINGLE_SIZE:
+        shingles = [data]
+    else:
+        shingles = {data[i:i + SHINGLE_SIZE] for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+    # Fibonacci hashing spreads CRC-32 output evenly over the bins. The top
+    # bits pick the bin; walking the hashes in descending order leaves each
+    # bin holding its smallest value.
+    hashes = sorted([(zlib.crc32(shingle) * 0x9E3779B1) & 0xFFFFFFFF for shingle in shingles],
+                    reverse=True)
+    minimums = {h >> (32 - _BIN_BITS): h & _VALUE_MASK for h in hashes}
+    sig = [minimums.get(i, _EMPTY) for i in range(NUM_HASHES)]
+
+    if _EMPTY in sig:
+        for i in range(NUM_HASHES):
+            if sig[i] == _EMPTY:
+                for step in range(1, NUM_HASHES):
+                    borrowed = sig[(i + step) % NUM_HASHES]
+                    if borrowed < _EMPTY:
+                        # Mixing in the distance keeps borrowed values from
+                        # matching the bin they were borrowed from
+                        sig[i] = _EMPTY + 1 + ((borrowed * 0x9E3779B1 + step * 0x85EBCA6B) & _VALUE_MASK)
+                        break
+    return array('H', [value & 0xFFFF for value in sig])
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+
+def band_keys(sig: array) -> List[int]:
+    """LSH bucket keys, one per band; notes sharing any key are candidates"""
+    data = sig.tobytes()
+    width = ROWS_PER_BAND * sig.itemsize
+    return [(band << 32) | zlib.crc32(data[band * width:(band + 1) * width])
+            for band in range(BANDS)]
+
+
+def note_text(fields: Iterable[str]) -> str:
+    """Text that identifies a question: its Question and Options fields"""
+    return ' '.join(list(fields)[:2])
+
+
+def has_images(fields: Iterable[str]) -> bool:
+    """
+    Whether a question shows images in its Question or Options field
+
+    Figure questions share a stem ("Choose the figure which completes the
+    series.") and differ only in their images, which signatures can't see,
+    so they are left out of the near-duplicate check.
+    """
+    return _IMG_RE.search(note_text(fields)) is not None
+
+
+class DuplicateIndex:
+    """
+    Persistent LSH index of question signatures
+
+    Signatures live in a SQLite file with one row per note and BANDS bucket
+    rows per note, about 650 bytes per note in total. A lookup is one
+    indexed query over the candidate's bucket keys plus a signature
+    comparison for each candidate, so its cost does not grow with the
+    number of notes in the index.
+
+    Notes added with bucketed=False (questions with images) are recorded
+    so sync() doesn't re-hash them, but they never match or get matched.
+    """
+
+    def __init__(self, path: str, threshold: float = DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY,
+                guid TEXT NOT NULL UNIQUE,
+                nid INTEGER NOT NULL,
+                mod INTEGER NOT NULL,
+                sig BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                bucket INTEGER NOT NULL,
+                note INTEGER NOT NULL,
+                PRIMARY KEY (bucket, note)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    def is_built(self) -> bool:
+        """True once a sync() has finished, i.e. every existing note was indexed"""
+        with self._lock:
+            return self._conn.execute("PRAGMA user_version").fetchone()[0] > 0
+
+    def find(self, sig: array, exclude_guid: Optional[str] = None) -> List[Tuple[str, int, float]]:
+        """
+        Indexed notes similar to a signature
+
+        Returns:
+            List of (guid, note id, similarity) at or above the threshold,
+            most similar first
+        """
+        keys = band_keys(sig)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT guid, nid, sig FROM notes WHERE id IN (
+                        SELECT note FROM buckets WHERE bucket IN ({','.join('?' * len(keys))}))""",
+                keys
+            ).fetchall()
+
+        matches = []
+        for guid, nid, blob in rows:
+            if guid == exclude_guid:
+                continue
+            score = similarity(sig, array('H', blob))
+            if score >= self.threshold:
+                matches.append((guid, nid, score))
+        matches.sort(key=lambda match: -match[2])
+        return matches
+
+    def add(self, guid: str, sig: array, nid: int = 0, mod: int = 0, commit: bool = True,
+            bucketed: bool = True):
+        """Insert or replace a note's signature"""
+        with self._lock:
+            self._add_locked(guid, sig, nid, mod, bucketed)
+            if commit:
+                self._conn.commit()
+
+    def add_many(self, entries: Iterable[Tuple[str, array, int, int, bool]]):
+        """Insert (guid, signature, note id, mod, bucketed) entries in one transaction"""
+        with self._lock:
+            for guid, sig, nid, mod, bucketed in entries:
+                self._add_locked(guid, sig, nid, mod, bucketed)
+            self._conn.commit()
+
+    def remove(self, guids: Iterable[str]):
+        """Drop notes from the index"""
+        with self._lock:
+            self._remove_locked(list(guids))
+            self._conn.commit()
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry; the next sync() rebuilds the index"""
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets")
+            self._conn.execute("DELETE FROM notes")
+            self._conn.execute("PRAGMA user_version = 0")
+            self._conn.commit()
+
+    def sync(self, col, mid: int) -> int:
+        """
+        Bring the index up to date with a collection's notes of one note type
+
+        Only notes that are new or modified since they were indexed are
+        re-hashed, and notes that no longer exist are dropped. The first
+        sync hashes every note (about 30s per 100k notes), so the add-on
+        runs it off the main thread.
+
+        Returns:
+            Number of notes (re)indexed
+        """
+        current = {guid: (nid, mod) for nid, guid, mod in
+                   col.db.all("select id, guid, mod from notes where mid = ?", mid)}
+        with self._lock:
+            indexed = dict(self._conn.execute("SELECT guid, mod FROM notes").fetchall())
+
+        stale = [guid for guid in indexed if guid not in current]
+        changed = [nid for guid, (nid, mod) in current.items() if indexed.get(guid) != mod]
+
+        if stale:
+            self.remove(stale)
+        for start in range(0, len(changed), _CHUNK):
+            chunk = changed[start:start + _CHUNK]
+            rows = col.db.all(
+                f"select id, guid, mod, flds from notes where id in ({','.join('?' * len(chunk))})",
+                *chunk
+            )
+            entries = []
+            for nid, guid, mod, flds in rows:
+                fields = flds.split('\x1f')
+                entries.append((guid, signature(note_text(fields)), nid, mod, not has_images(fields)))
+            self.add_many(entries)
+        with self._lock:
+            self._conn.execute("PRAGMA user_version = 1")
+            self._conn.commit()
+        return len(changed)
+
+    def _add_locked(self, guid: str, sig: array, nid: int, mod: int, bucketed: bool = True):
+        row = self._conn.execute("SELECT id, sig FROM notes WHERE guid = ?", (guid,)).fetchone()
+        if row:
+            self._delete_buckets_locked(row[0], row[1])
+            note_id = row[0]
+            self._conn.execute(
+                "UPDATE notes SET nid = ?, mod = ?, sig = ? WHERE id = ?",
+                (nid, mod, sig.tobytes(), note_id)
+            )
+        else:
+            note_id = self._conn.execute(
+                "INSERT INTO notes (guid, nid, mod, sig) VALUES (?, ?, ?, ?)",
+                (guid, nid, mod, sig.tobytes())
+            ).lastrowid
+        if bucketed:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO buckets VALUES (?, ?)",
+                [(key, note_id) for key in band_keys(sig)]
+            )
+
+    def _delete_buckets_locked(self, note_id: int, blob: bytes):
+        # Bucket keys are recomputed from the stored signature, so the
+        # primary key is all the bucket table needs
+        self._conn.executemany(
+            "DELETE FROM buckets WHERE bucket = ? AND note = ?",
+            [(key, note_id) for key in band_keys(array('H', blob))]
+        )
+
+    def _remove_locked(self, guids: List[str]):
+        for start in range(0, len(guids), _CHUNK):
+            chunk = guids[start:start + _CHUNK]
+            rows = self._conn.execute(
+                f"SELECT id, sig FROM notes WHERE guid IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for note_id, blob in rows:
+                self._delete_buckets_locked(note_id, blob)
+            self._conn.executemany("DELETE FROM notes WHERE id = ?", [(row[0],) for row in rows])
+
+
+_shared_indexes: Dict[str, DuplicateIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_duplicate_index(config: Optional[Dict], col) -> Optional[DuplicateIndex]:
+    """
+    Return the near-duplicate index for a collection, or None when the
+    'near_duplicates' config option is "off"
+
+    Each collection gets its own index file in the add-on folder.
+    """
+    config = config or {}
+    if config.get('near_duplicates', 'flag') == 'off':
+        return None
+
+    collection_id = hashlib.sha1(os.path.abspath(col.path).encode('utf-8')).hexdigest()[:12]
+    path = os.path.join(os.path.dirname(__file__), f"dedup_index_{collection_id}.sqlite3")
+    with _shared_lock:
+        index = _shared_indexes.get(path)
+        if index is None:
+            try:
+                index = DuplicateIndex(path)
+            except sqlite3.Error as e:
+                print(f"Error opening near-duplicate index: {e}")
+                return None
+            _shared_indexes[path] = index
+        index.threshold = float(config.get('near_duplicate_threshold', DEFAULT_THRESHOLD))
+    return index
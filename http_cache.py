@@ -0,0 +1,177 @@
+"""
+HTTP Cache Module
+Persistent on-disk cache for IndiaBix pages with ETag/Last-Modified revalidation
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Dict, Optional, NamedTuple
+
+# A cache hit only rewrites last_access when the stored value is older than
+# this, so reading the same page repeatedly doesn't commit every time
+TOUCH_INTERVAL = 60
+
+# Oldest pages looked at per query while evicting
+EVICT_BATCH = 32
+
+
+class CachedPage(NamedTuple):
+    """A cached response body together with its validators"""
+    url: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class HttpCache:
+    """
+    Size-bounded page cache stored in a single SQLite file
+
+    Bodies are zlib-compressed. When the stored size exceeds max_bytes the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024,
+                 touch_interval: float = TOUCH_INTERVAL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached page for a URL (marking it used), or None if it isn't cached"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, last_access FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            now = time.time()
+            if row and now - row[3] > self.touch_interval:
+                self._conn.execute(
+                    "UPDATE pages SET last_access = ? WHERE url = ?", (now, url)
+                )
+                self._conn.commit()
+        if not row:
+            return None
+        try:
+            body = zlib.decompress(row[0])
+        except zlib.error:
+            self.delete(url)
+            return None
+        return CachedPage(url, body, row[1], row[2])
+
+    def conditional_headers(self, page: Optional[CachedPage]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a cached page"""
+        headers = {}
+        if page:
+            if page.etag:
+                headers['If-None-Match'] = page.etag
+            if page.last_modified:
+                headers['If-Modified-Since'] = page.last_modified
+        return headers
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """Store a response body and its validators, then enforce the size budget"""
+        compressed = zlib.compress(body, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, compressed, len(compressed), etag, last_modified, time.time())
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def touch(self, url: str):
+        """Mark a cached page as recently used (e.g. after a 304)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url)
+            )
+            self._conn.commit()
+
+    def delete(self, url: str):
+        """Remove a single page from the cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached page"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def total_size(self) -> int:
+        """Total compressed size of all cached bodies in bytes"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()[0]
+
+    def _evict_locked(self):
+        """Drop least recently used pages until the cache fits in max_bytes"""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM pages ORDER BY last_access ASC LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                total -= size
+
+
+_shared_caches: Dict[str, HttpCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_http_cache(config: Optional[Dict]) -> Optional[HttpCache]:
+    """
+    Return the add-on's shared page cache, or None when caching is disabled
+
+    Uses the 'http_cache_mb' config option; 0 turns the cache off.
+    """
+    config = config or {}
+    max_mb = config.get('http_cache_mb', 50)
+    if not max_mb:
+        return None
+
+    path = os.path.join(os.path.dirname(__file__), "http_cache.sqlite3")
+    with _shared_lock:
+        cache = _shared_caches.get(path)
+        if cache is None:
+            try:
+                cache = HttpCache(path)
+            except sqlite3.Error as e:
+                print(f"Error opening HTTP cache: {e}")
+                return None
+            _shared_caches[path] = cache
+        cache.max_bytes = int(max_mb * 1024 * 1024)
+    return cache
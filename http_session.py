@@ -0,0 +1,80 @@
+"""
+HTTP Session Module
+Process-wide pooled requests.Session shared by every IndiaBixScraper
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+_session: Optional[requests.Session] = None
+_session_key = None
+_largest_pool = 1
+_session_lock = threading.Lock()
+
+
+def build_session(pool_size: int = 10, retries: int = 3, keep_alive: bool = True,
+                  user_agent: Optional[str] = None) -> requests.Session:
+    """
+    Create a session with a sized connection pool and a retry adapter
+
+    Connection errors and transient gateway failures (500/502/504) are
+    retried with exponential backoff. 429 and 503 are left to the caller,
+    since those mean the site wants us to slow down.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+        # Otherwise urllib3 sleeps out Retry-After on 429/503 itself and the
+        # rate limiter never sees the throttling
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': user_agent or DEFAULT_USER_AGENT})
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def get_shared_session(config: Optional[Dict] = None, min_pool_size: int = 1) -> requests.Session:
+    """
+    Return the add-on's shared session, creating it on first use
+
+    Every scraper reuses the same warm connections. The session is rebuilt
+    only if the relevant config options change.
+    """
+    global _session, _session_key, _largest_pool
+    config = config or {}
+
+    with _session_lock:
+        # Never shrink the pool just because a caller needs fewer connections
+        _largest_pool = max(_largest_pool, int(min_pool_size or 1))
+        key = (
+            max(int(config.get('http_pool_size', 10)), _largest_pool),
+            int(config.get('http_retries', 3)),
+            bool(config.get('http_keep_alive', True)),
+            config.get('user_agent') or DEFAULT_USER_AGENT,
+        )
+        if _session is None or key != _session_key:
+            _session = build_session(*key)
+            _session_key = key
+        return _session
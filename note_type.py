@@ -0,0 +1,215 @@
+"""
+IndiaBix Flashcard Generator - Note Type Module
+Creates, caches and migrates the "IndiaBix MCQ" note type
+"""
+
+import weakref
+from typing import Callable, Dict
+
+MODEL_NAME = "IndiaBix MCQ"
+FIELDS = ["Question", "Options", "Answer", "Explanation"]
+
+# Bump SCHEMA_VERSION and add a MIGRATIONS entry whenever the templates
+# or CSS below change; existing note types are upgraded on the next import.
+SCHEMA_VERSION = 1
+VERSION_KEY = "indiabixSchemaVersion"
+
+FRONT_TEMPLATE = """
+<div class="question">
+    <h3>Question:</h3>
+    {{Question}}
+</div>
+
+<div class="options">
+    <h4>Options:</h4>
+    {{Options}}
+</div>
+"""
+
+BACK_TEMPLATE = """
+{{FrontSide}}
+
+<hr id="answer">
+
+<div class="answer">
+    <h3 style="color: green;">Correct Answer:</h3>
+    <strong>{{Answer}}</strong>
+</div>
+
+{{#Explanation}}
+<div class="explanation">
+    <h4>Explanation:</h4>
+    {{Explanation}}
+</div>
+{{/Explanation}}
+"""
+
+CSS = """
+.card {
+    font-family: Arial, sans-serif;
+    font-size: 16px;
+    text-align: left;
+    color: #000; /* Changed from #333 to pure black */
+    background-color: #fff;
+    padding: 20px;
+}
+
+/* Ensure all nested text is black */
+.card * {
+    color: #000 !important;
+}
+
+.question {
+    margin-bottom: 20px;
+    padding: 15px;
+    background-color: #f0f8ff;
+    border-left: 4px solid #2196F3;
+    border-radius: 4px;
+}
+
+.question h3 {
+    margin-top: 0;
+    color: #000; /* Make heading black */
+}
+
+.options {
+    margin-bottom: 20px;
+    padding: 15px;
+    background-color: #f9f9f9;
+    border-radius: 4px;
+}
+
+.options h4 {
+    margin-top: 0;
+    color: #000; /* Make heading black */
+}
+
+.answer {
+    padding: 15px;
+    background-color: #e8f5e9;
+    border-left: 4px solid #4CAF50;
+    border-radius: 4px;
+    margin-bottom: 20px;
+}
+
+.explanation {
+    padding: 15px;
+    background-color: #fff3e0;
+    border-left: 4px solid #FF9800;
+    border-radius: 4px;
+    margin-top: 20px;
+}
+
+.explanation h4 {
+    margin-top: 0;
+    color: #000; /* Make heading black */
+}
+
+strong {
+    font-size: 18px;
+    color: #000; /* Ensure bold text is black */
+}
+
+hr {
+    border: none;
+    border-top: 2px solid #e0e0e0;
+    margin: 20px 0;
+}
+"""
+
+
+def _apply_layout(models, model: dict):
+    """Give a new note type its fields, card template and CSS"""
+    existing = {field['name'] for field in model['flds']}
+    for name in FIELDS:
+        if name not in existing:
+            models.add_field(model, models.new_field(name))
+
+    if model['tmpls']:
+        template = model['tmpls'][0]
+        template['qfmt'] = FRONT_TEMPLATE
+        template['afmt'] = BACK_TEMPLATE
+    else:
+        template = models.new_template("Card 1")
+        template['qfmt'] = FRONT_TEMPLATE
+        template['afmt'] = BACK_TEMPLATE
+        models.add_template(model, template)
+    model['css'] = CSS
+
+
+def _adopt_unversioned(models, model: dict):
+    """Note types made before versioning already have the version 1 layout"""
+
+
+# Target version -> migration; each runs on note types older than its key.
+# Migrations run inside an import and replace whatever the user changed in
+# the parts they rewrite, so they should only touch templates and CSS that
+# actually changed. Adding or removing fields is a schema change (full sync)
+# that needs the user's confirmation, so it must not happen here.
+MIGRATIONS: Dict[int, Callable] = {
+    1: _adopt_unversioned,  # Unversioned models count as 0
+}
+
+# Model id per open collection, so the note type is looked up by name once
+_model_ids = weakref.WeakKeyDictionary()
+
+
+class NoteTypeManager:
+    """
+    Resolves the IndiaBix MCQ note type for a collection
+
+    The model id is cached for as long as the collection stays open. The
+    first lookup also creates the note type if needed, or brings an older
+    one up to SCHEMA_VERSION in a single save.
+    """
+
+    def __init__(self, collection):
+        self.col = collection
+
+    def get(self) -> dict:
+        """Return the note type, creating or migrating it on first use"""
+        mid = _model_ids.get(self.col)
+        if mid is not None:
+            model = self.col.models.get(mid)
+            if model:
+                return model
+
+        model = self.col.models.by_name(MODEL_NAME)
+        if model:
+            self.migrate(model)
+        else:
+            model = self.create()
+        _model_ids[self.col] = model['id']
+        return model
+
+    def model_id(self) -> int:
+        return self.get()['id']
+
+    def create(self) -> dict:
+        """Add a new note type at the current schema version"""
+        models = self.col.models
+        model = models.new(MODEL_NAME)
+        _apply_layout(models, model)
+        model[VERSION_KEY] = SCHEMA_VERSION
+        models.add(model)
+        return model
+
+    def migrate(self, model: dict) -> bool:
+        """
+        Apply pending migrations to an existing note type
+
+        Returns:
+            True if the note type was changed and saved
+        """
+        version = model.get(VERSION_KEY, 0)
+        if version >= SCHEMA_VERSION:
+            return False
+
+        models = self.col.models
+        for target in sorted(MIGRATIONS):
+            if version < target <= SCHEMA_VERSION:
+                MIGRATIONS[target](models, model)
+        model[VERSION_KEY] = SCHEMA_VERSION
+        models.save(model)
+        print(f"Updated {MODEL_NAME} note type from version {version} to {SCHEMA_VERSION}")
+        return True
@@ -0,0 +1,130 @@
+"""
+Profiling Module
+One-shot cProfile + tracemalloc capture of the next scrape, import or sync
+"""
+
+import os
+import time
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), "profiles")
+
+# Frames kept per allocation; deeper tracebacks make tracing much slower
+TRACEBACK_FRAMES = 10
+TOP_ALLOCATIONS = 30
+
+_armed = False
+_lock = threading.Lock()
+
+# Called as on_captured(operation, report paths) after a capture was written,
+# from whichever thread ran the operation. __init__ sets it to reset the
+# Tools menu toggle.
+on_captured: Optional[Callable[[str, List[str]], None]] = None
+
+
+def arm(enabled: bool = True):
+    """Profile the next operation that runs under capture() (or stop waiting for one)"""
+    global _armed
+    with _lock:
+        _armed = enabled
+
+
+def is_armed() -> bool:
+    return _armed
+
+
+def _take() -> bool:
+    """Disarm and return True if this caller gets to profile"""
+    global _armed
+    with _lock:
+        taken, _armed = _armed, False
+        return taken
+
+
+@contextmanager
+def capture(operation: str):
+    """
+    Profile the enclosed block if profiling was armed, otherwise do nothing
+
+    cProfile sees the calling thread only; work done on fetch worker threads
+    shows up as time spent waiting for their results. tracemalloc covers
+    every thread.
+
+    Writes <timestamp>-<operation>.prof (open with pstats or snakeviz) and
+    <timestamp>-<operation>-allocations.txt to the add-on's profiles folder.
+    """
+    if not _armed or not _take():
+        yield
+        return
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            paths = write_reports(operation, profiler, snapshot, peak, elapsed, PROFILE_DIR)
+        except OSError as e:
+            print(f"Error writing profile for {operation}: {e}")
+            paths = []
+        if on_captured:
+            on_captured(operation, paths)
+
+
+def write_reports(operation: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot,
+                  peak: int, elapsed: float, directory: str) -> List[str]:
+    """
+    Save the profile and a top-allocations report in a directory
+
+    Returns:
+        Paths of the .prof file and the allocations report
+    """
+    os.makedirs(directory, exist_ok=True)
+    slug = "".join(c if c.isalnum() else "-" for c in operation.lower()).strip("-")
+    base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}")
+
+    profile_path = base + ".prof"
+    profiler.dump_stats(profile_path)
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ])
+    by_line = snapshot.statistics('lineno')
+    by_trace = snapshot.statistics('traceback')
+
+    report_path = base + "-allocations.txt"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"Operation: {operation}\n")
+        f.write(f"Wall time: {elapsed:.2f}s\n")
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+        f.write(f"Still allocated at the end: {sum(s.size for s in by_line) / 1024 / 1024:.1f} MiB\n\n")
+
+        f.write(f"Top {TOP_ALLOCATIONS} allocation sites still alive at the end\n")
+        for stat in by_line[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}\n")
+
+        f.write("\nLargest allocations with their call stacks\n")
+        for stat in by_trace[:5]:
+            f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format(most_recent_first=True):
+                f.write(line + "\n")
+
+    print(f"Profile of {operation} written to {profile_path}")
+    return [profile_path, report_path]
@@ -0,0 +1,251 @@
+"""
+Rate Limiter Module
+Per-host token-bucket rate limiting with adaptive (AIMD) concurrency
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Responses that mean the site wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# Longest Retry-After the limiter will honour by pausing a host; longer
+# requests fail instead of blocking a sync for that long
+DEFAULT_MAX_PAUSE = 60.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) to seconds from now"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class HostLimiter:
+    """
+    Politeness controls for a single host
+
+    A token bucket caps the request rate, while the number of requests in
+    flight follows additive-increase/multiplicative-decrease: each response
+    with normal latency grows the limit by 1/limit (about +1 per round
+    trip), a 429/503 halves it, and latency well above the best seen so far
+    shrinks it gently. Retry-After pauses the host entirely, for at most
+    max_pause seconds.
+    """
+
+    def __init__(self, rate: float = 4.0, burst: int = 8, initial_concurrency: float = 2.0,
+                 max_concurrency: int = 8, latency_tolerance: float = 2.5,
+                 max_pause: float = DEFAULT_MAX_PAUSE):
+        self.rate = float(rate)
+        self.max_pause = float(max_pause)
+        self.burst = max(1, int(burst))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.limit = min(float(initial_concurrency), float(self.max_concurrency))
+        self.latency_tolerance = latency_tolerance
+
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.base_latency: Optional[float] = None
+        self.avg_latency: Optional[float] = None
+        self.completed_since_decrease = 0
+        self.requests = 0
+        self.throttled = 0
+
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        else:
+            self.tokens = float(self.burst)
+        self.last_refill = now
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until a request may start, 0 if it may start now"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= max(1, int(self.limit)):
+            return 0.5  # woken early by release()
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0.0
+
+    def acquire(self, cancelled=None):
+        """
+        Block until a request may be sent
+
+        Args:
+            cancelled: Optional callable; when it returns True the wait is
+                abandoned with InterruptedError
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.requests += 1
+                    return
+                if cancelled and cancelled():
+                    raise InterruptedError("Request cancelled")
+                self._cond.wait(min(wait, 0.5))
+
+    def release(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """Record the outcome of a request and adapt the concurrency limit"""
+        with self._cond:
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self.limit = max(1.0, self.limit / 2)
+                self.completed_since_decrease = 0
+                pause = retry_after if retry_after is not None else 1.0 / max(self.rate, 0.5)
+                pause = min(pause, self.max_pause)
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            elif status is not None:
+                self._observe_latency(latency)
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float):
+        self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+        if self.base_latency is None or latency < self.base_latency:
+            self.base_latency = latency
+
+        self.completed_since_decrease += 1
+        slow = self.avg_latency > self.base_latency * self.latency_tolerance
+        if slow and self.completed_since_decrease >= self.limit:
+            # At most one latency-driven decrease per window of responses
+            self.limit = max(1.0, self.limit * 0.8)
+            self.completed_since_decrease = 0
+        elif not slow:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+
+    def state(self) -> Dict:
+        """Snapshot of the limiter for status displays"""
+        with self._cond:
+            return {
+                'rate': self.rate,
+                'concurrency': self.limit,
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'avg_latency': self.avg_latency,
+                'paused_for': max(0.0, self.paused_until - time.monotonic()),
+            }
+
+
+class RequestScheduler:
+    """Hands out per-host limiters sharing one set of settings"""
+
+    throttle_statuses = THROTTLE_STATUSES
+
+    def __init__(self, rate: float = 4.0, burst: int = 8, initial_concurrency: float = 2.0,
+                 max_concurrency: int = 8, max_pause: float = DEFAULT_MAX_PAUSE):
+        self.max_pause = float(max_pause)
+        self.settings = {
+            'rate': rate,
+            'burst': burst,
+            'initial_concurrency': initial_concurrency,
+            'max_concurrency': max_concurrency,
+            'max_pause': max_pause,
+        }
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, url: str) -> HostLimiter:
+        """Return the limiter for the URL's host"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = self._hosts[host] = HostLimiter(**self.settings)
+            return limiter
+
+    @contextmanager
+    def slot(self, url: str, cancelled=None):
+        """
+        Hold a request slot for the URL's host
+
+        The caller reports the outcome with slot.done(status, retry_after);
+        if it doesn't (e.g. the request raised), the slot is released as a
+        failure that doesn't affect the concurrency limit.
+        """
+        limiter = self.limiter(url)
+        limiter.acquire(cancelled)
+        slot = _Slot(limiter)
+        try:
+            yield slot
+        finally:
+            slot.finish()
+
+    def describe(self, url: str) -> str:
+        """One-line summary of a host's limiter for the status log"""
+        state = self.limiter(url).state()
+        text = (f"Rate limit {state['rate']:g} req/s, concurrency "
+                f"{state['concurrency']:.1f}/{state['max_concurrency']}, "
+                f"{state['requests']} requests, {state['throttled']} throttled")
+        if state['avg_latency'] is not None:
+            text += f", avg latency {state['avg_latency'] * 1000:.0f} ms"
+        if state['paused_for'] > 0:
+            text += f", paused {state['paused_for']:.0f}s (Retry-After)"
+        return text
+
+
+class _Slot:
+    def __init__(self, limiter: HostLimiter):
+        self.limiter = limiter
+        self.started = time.monotonic()
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self._finished = False
+
+    def done(self, status: int, retry_after: Optional[str] = None):
+        self.status = status
+        self.retry_after = parse_retry_after(retry_after)
+
+    def finish(self):
+        if not self._finished:
+            self._finished = True
+            self.limiter.release(self.status, time.monotonic() - self.started, self.retry_after)
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_key = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler(config: Optional[Dict] = None) -> Optional[RequestScheduler]:
+    """
+    Return the add-on's shared request scheduler, or None if rate limiting
+    is turned off ('requests_per_second' set to 0)
+
+    'max_retry_after' caps how long a Retry-After may pause a host.
+    """
+    global _scheduler, _scheduler_key
+    config = config or {}
+    rate = float(config.get('requests_per_second', 4.0))
+    if rate <= 0:
+        return None
+    key = (rate, int(config.get('max_concurrency', 8)),
+           float(config.get('max_retry_after', DEFAULT_MAX_PAUSE)))
+
+    with _scheduler_lock:
+        if _scheduler is None or key != _scheduler_key:
+            _scheduler = RequestScheduler(rate=key[0], burst=max(1, int(key[0] * 2)),
+                                          max_concurrency=key[1], max_pause=key[2])
+            _scheduler_key = key
+        return _scheduler
@@ -4,11 +4,107 @@ Handles fetching and parsing questions from IndiaBix website
 """
 
 import re
+import sys
+import time
+import itertools
+import threading
+import multiprocessing
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from bs4 import BeautifulSoup, SoupStrainer, FeatureNotFound
+from typing import List, Dict, Optional, Iterator, Tuple
 from urllib.parse import urlparse, urljoin
 
+try:
+    from .tracing import NULL_TRACER
+except ImportError:  # imported as a top-level module (tests, benchmarks)
+    from tracing import NULL_TRACER
+
+
+# Site the scraper talks to; IndiaBixScraper(base_url=...) points it at a
+# mirror or a local test server instead
+DEFAULT_BASE_URL = "https://www.indiabix.com"
+
+# Longer inputs are returned stripped but otherwise unformatted, so a
+# malformed page can't make the formatting rules run away
+MAX_FORMAT_LENGTH = 50000
+
+# Any of these means the question contains a code snippet
+# ('{' and '}' are checked separately since both must be present)
+_CODE_MARKERS_RE = re.compile(
+    r'#include|int main\(\)|printf\(|return 0|void |class |def |function '
+    r'|for\(|while\(|if\('
+)
+
+# Code layout rules. Every rule only inserts newlines, so they can all be
+# applied in one scan; an #include directive swallows everything up to the
+# next '>', so its body is formatted with the remaining rules.
+_CODE_INCLUDE_RE = re.compile(r'#include[^>]*>')
+_CODE_RULES = (
+    r'(?P<main>int main\(\))'                # newline before main()
+    r'|(?P<open>\{)'                          # newline after {
+    r'|(?P<close>\})'                         # newline before }
+    r'|(?P<semi>;)(?=\s*[a-zA-Z_])'            # newline after ; before a statement
+    r'|(?P<ret>return \d+;)'                  # newline before return N; (and after, like any ;)
+)
+_STATEMENT_AHEAD_RE = re.compile(r'\s*[a-zA-Z_]')
+_CODE_INNER_RE = re.compile(_CODE_RULES)
+_CODE_RE = re.compile(r'(?P<include>#include[^>]*>)|' + _CODE_RULES)
+
+# Prose rules: paragraph break after '?' or '.' that starts a new sentence
+_PROSE_RE = re.compile(r'\?(?=[A-Z])|\.(?=[A-Z][a-z])')
+
+# Explanation rules, ordered so that whichever rule would have won in the
+# original sequence of substitutions is tried first at each position
+_EXPLANATION_RE = re.compile(
+    r'(?P<step>Step \d+:)'                                         # break before "Step N:"
+    r'|;(?=[a-z])'                                                 # break after ; in steps
+    r'|(?P<here>[;,])(?i:here) '                                   # break before "here"
+    r'|(?P<conj_sep>[.;])(?P<conj>(?i:hence|so|therefore)) '       # break before conclusions
+    r'|\.(?P<the>(?i:the (?:answer|output|result|solution)))'      # break before "The answer"
+    r'|\.(?!Step \d+:)(?P<upper>[A-Z])'                            # break between sentences
+)
+_CONCLUSIONS = {'hence': 'Hence', 'so': 'So', 'therefore': 'Therefore'}
+
+_EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+
+
+def _format_code_match(match) -> str:
+    kind = match.lastgroup
+    text = match.group(0)
+    if kind == 'include':
+        return _CODE_INNER_RE.sub(_format_code_match, text) + '\n'
+    if kind in ('open', 'semi'):
+        return text + '\n'
+    if kind == 'ret' and _STATEMENT_AHEAD_RE.match(match.string, match.end()):
+        return '\n' + text + '\n'
+    return '\n' + text
+
+
+def _format_explanation_match(match) -> str:
+    kind = match.lastgroup
+    if kind == 'step':
+        return '\n\n' + match.group('step') + ' '
+    if kind == 'here':
+        return match.group('here') + '\n\nHere '
+    if kind == 'conj':
+        return match.group('conj_sep') + '\n\n' + _CONCLUSIONS[match.group('conj').casefold()] + ' '
+    if kind == 'the':
+        return '.\n\n' + match.group('the')
+    if kind == 'upper':
+        return '.\n\n' + match.group('upper')
+    return ';\n'
+
+
+def _collapse_newlines(text: str) -> str:
+    """Remove multiple consecutive line breaks (more than 2)"""
+    if '\n\n\n' in text:
+        text = _EXTRA_NEWLINES_RE.sub('\n\n', text)
+    return text
+
 
 def format_question_text(text: str) -> str:
     """
@@ -17,46 +113,20 @@ def format_question_text(text: str) -> str:
     """
     if not text:
         return ""
+    if len(text) > MAX_FORMAT_LENGTH:
+        return text.strip()
     
-    # Check if the text contains code patterns
-    has_code = any([
-        '#include' in text,
-        'int main()' in text,
-        'printf(' in text,
-        'return 0' in text,
-        '{' in text and '}' in text,
-        'void ' in text,
-        'class ' in text,
-        'def ' in text,
-        'function ' in text,
-        'for(' in text or 'while(' in text,
-        'if(' in text,
-    ])
+    has_code = ('{' in text and '}' in text) or _CODE_MARKERS_RE.search(text)
     
     if has_code:
-        # Format as code block
-        # Add line breaks after common code patterns
-        text = re.sub(r'(#include[^>]*>)', r'\1\n', text)
-        text = re.sub(r'(int main\(\))', r'\n\1', text)
-        text = re.sub(r'({)', r'\1\n', text)
-        text = re.sub(r'(})', r'\n\1', text)
-        text = re.sub(r'(;)(?=\s*[a-zA-Z_])', r'\1\n', text)
-        text = re.sub(r'(return \d+;)', r'\n\1', text)
-        
-        # Clean up multiple line breaks
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        # Format as code block, adding line breaks around statements
+        text = _collapse_newlines(_CODE_RE.sub(_format_code_match, text))
     else:
-        # Regular question formatting
-        # Add line breaks after question marks if followed by capital letter
-        text = re.sub(r'\?([A-Z])', r'?\n\n\1', text)
-        
-        # Add line breaks after periods followed by capital letters
-        text = re.sub(r'\.([A-Z][a-z])', r'.\n\n\1', text)
+        # Regular question formatting: paragraph breaks between sentences
+        text = _PROSE_RE.sub('\\g<0>\n\n', text)
     
     # Clean up any leading/trailing whitespace
-    text = text.strip()
-    
-    return text
+    return text.strip()
 
 
 def format_explanation_text(text: str) -> str:
@@ -66,57 +136,308 @@ def format_explanation_text(text: str) -> str:
     """
     if not text:
         return ""
+    if len(text) > MAX_FORMAT_LENGTH:
+        return text.strip()
     
-    # Add line breaks before "Step X:" patterns
-    text = re.sub(r'(Step \d+:)', r'\n\n\1 ', text)
-    
-    # Add line breaks after semicolons in steps
-    text = re.sub(r';(?=[a-z])', r';\n', text)
-    
-    # Add line breaks around "here" explanations  
-    text = re.sub(r'([;,])here ', r'\1\n\nHere ', text, flags=re.IGNORECASE)
+    text = _collapse_newlines(_EXPLANATION_RE.sub(_format_explanation_match, text))
     
-    # Add line breaks before "Hence" for conclusions
-    text = re.sub(r'([\.;])Hence ', r'\1\n\nHence ', text, flags=re.IGNORECASE)
-    
-    # Add line breaks before "So" for conclusions
-    text = re.sub(r'([\.;])So ', r'\1\n\nSo ', text, flags=re.IGNORECASE)
+    # Clean up any leading/trailing whitespace
+    return text.strip()
+
+
+PAGINATION_HREF_RE = re.compile(r'/\d{6}$')
+
+
+def _class_contains(value, class_name: str) -> bool:
+    """Check a raw or already-split class attribute for a class name"""
+    if not value:
+        return False
+    if isinstance(value, str):
+        value = value.split()
+    return class_name in value
+
+
+def is_scraped_tag(name: str, attrs: Optional[Dict] = None) -> bool:
+    """
+    Decide whether a top-level tag is one the scraper reads:
+    a question container or a pagination link
+    """
+    if attrs is None:
+        return name in ('div', 'a')
+    if name == 'div':
+        return _class_contains(attrs.get('class'), 'bix-div-container')
+    if name == 'a':
+        return bool(PAGINATION_HREF_RE.search(attrs.get('href') or ''))
+    return False
+
+
+class QuestionPageStrainer(SoupStrainer):
+    """
+    Only build the parts of a page the scraper reads, skipping navigation,
+    ads and scripts entirely.
     
-    # Add line breaks before "Therefore"
-    text = re.sub(r'([\.;])Therefore ', r'\1\n\nTherefore ', text, flags=re.IGNORECASE)
+    Older BeautifulSoup releases call a callable name rule with the tag's
+    attributes; 4.13+ asks allow_tag_creation instead.
+    """
     
-    # Add line breaks after periods followed by capital letters
-    text = re.sub(r'\.([A-Z])', r'.\n\n\1', text)
+    def __init__(self):
+        super().__init__(is_scraped_tag)
     
-    # Add line breaks before "This means", "This is", etc.
-    text = re.sub(r'\.This ', r'.\n\nThis ', text)
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return is_scraped_tag(name, attrs or {})
+
+
+# Question container classes that start a section whose scripts and images
+# parse_question needs to post-process
+_SECTION_CLASSES = {
+    'bix-td-qtxt': 'question',
+    'bix-ans-option': 'answer_div',
+    'bix-ans-description': 'description',
+    'bix-div-answer-description': 'answer_description',
+}
+
+
+def extract_question_parts(question_div) -> Dict:
+    """
+    Collect everything parse_question reads from a bix-div-container
+    in a single depth-first walk, in document order.
     
-    # Add line breaks before "The answer", "The output", "The result"
-    text = re.sub(r'\.(The (?:answer|output|result|solution))', r'.\n\n\1', text, flags=re.IGNORECASE)
+    Returns a dict with the first 'question', 'answer_div', 'answer_span',
+    'hidden_answer', 'description' and 'answer_description' elements, the
+    list of 'options' rows, and 'sections' mapping id(section element) to the
+    (script/style tags, img tags) found inside it.
+    """
+    parts = {
+        'question': None,
+        'options': [],
+        'answer_div': None,
+        'answer_span': None,
+        'hidden_answer': None,
+        'description': None,
+        'answer_description': None,
+        'sections': {},
+    }
+    sections = parts['sections']
     
-    # Remove multiple consecutive line breaks (more than 2)
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    # Each stack entry carries the section elements enclosing the node
+    stack = [(child, ()) for child in reversed(question_div.contents)]
+    while stack:
+        node, enclosing = stack.pop()
+        name = node.name
+        if name is None:
+            continue  # NavigableString
+        
+        if name in ('script', 'style'):
+            for section in enclosing:
+                sections[id(section)][0].append(node)
+            continue
+        
+        if name == 'img':
+            for section in enclosing:
+                sections[id(section)][1].append(node)
+        
+        classes = node.get('class') or ()
+        if classes:
+            if name == 'div':
+                if 'bix-opt-row' in classes:
+                    parts['options'].append(node)
+                for cls in classes:
+                    key = _SECTION_CLASSES.get(cls)
+                    if key and parts[key] is None:
+                        parts[key] = node
+                        if id(node) not in sections:
+                            sections[id(node)] = ([], [])
+                            enclosing = enclosing + (node,)
+            elif name == 'span':
+                if parts['hidden_answer'] is None and 'jq-hdnakqb' in classes:
+                    parts['hidden_answer'] = node
+                if (parts['answer_span'] is None
+                        and parts['answer_div'] is not None
+                        and any(section is parts['answer_div'] for section in enclosing)
+                        and any('option-svg-letter-' in cls for cls in classes)):
+                    parts['answer_span'] = node
+        
+        children = node.contents
+        if children:
+            stack.extend((child, enclosing) for child in reversed(children))
     
-    # Clean up any leading/trailing whitespace
-    text = text.strip()
+    return parts
+
+
+def resolve_parser(preferred: str = 'lxml') -> str:
+    """Return the preferred BeautifulSoup backend, falling back to html.parser"""
+    try:
+        BeautifulSoup('', preferred)
+        return preferred
+    except FeatureNotFound:
+        print(f"HTML parser '{preferred}' not available, using html.parser")
+        return 'html.parser'
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_processes = 0
+_parse_pool_lock = threading.Lock()
+_worker_scrapers: Dict[Tuple[str, str], 'IndiaBixScraper'] = {}
+
+
+def _parse_pool_context():
+    """
+    Start method for parse workers, or None if workers can't be started safely
+
+    Never fork: the host is a multithreaded Qt process. spawn and forkserver
+    re-run the host's main script in each worker unless it was started with
+    -m or -c, and Anki's runner script isn't safe to re-run.
+    """
+    if getattr(sys, 'frozen', False):
+        return None
+    main = sys.modules.get('__main__')
+    spec_name = getattr(getattr(main, '__spec__', None), 'name', None) or ''
+    reruns_main = (getattr(main, '__file__', None) is not None
+                   and not (spec_name == '__main__' or spec_name.endswith('.__main__')))
+    if reruns_main and 'aqt' in sys.modules:
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    method = 'forkserver' if 'forkserver' in methods and sys.platform != 'darwin' else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def get_parse_pool(processes: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Return the process-wide pool used for parsing pages, or None where
+    worker processes can't be used (frozen builds, Anki's main script,
+    no multiprocessing support)
+
+    Asking for a different number of processes replaces the pool.
+    """
+    global _parse_pool, _parse_pool_processes
+    with _parse_pool_lock:
+        if _parse_pool is not None and _parse_pool_processes != processes:
+            _parse_pool.shutdown(wait=False)
+            _parse_pool = None
+        if _parse_pool is None:
+            context = _parse_pool_context()
+            if context is None:
+                return None
+            try:
+                _parse_pool = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+            except (ImportError, OSError, NotImplementedError, ValueError) as e:
+                print(f"Process pool unavailable, parsing in-process: {e}")
+                return None
+            _parse_pool_processes = processes
+        return _parse_pool
+
+
+def discard_parse_pool(pool: ProcessPoolExecutor):
+    """Drop a pool that has broken so the next scrape starts a fresh one"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+
+def parse_page_content(content: bytes, page_num: int, parser: str = 'lxml',
+                       base_url: str = DEFAULT_BASE_URL) -> List[Dict]:
+    """
+    Parse one page's raw HTML into plain question dicts
     
-    return text
+    Module-level so it can run in a worker process; the returned records
+    only hold strings, bools, ints and dicts, so they pickle cheaply.
+    """
+    scraper = _worker_scrapers.get((parser, base_url))
+    if scraper is None:
+        scraper = _worker_scrapers[(parser, base_url)] = IndiaBixScraper(parser=parser, base_url=base_url)
+    soup = scraper.parse_html(content)
+    return list(scraper.iter_page_questions(soup, page_num))
+
+
+# Links to daily pages on a current-affairs listing/archive page
+CURRENT_AFFAIRS_LINK_RE = re.compile(
+    rb'''href\s*=\s*["']([^"']*/current-affairs/(\d{4}-\d{2}-\d{2})/?)["']''', re.I
+)
+
+
+class PageNotFoundError(Exception):
+    """The page doesn't exist (404/410), as opposed to a transient failure"""
+
+
+class ThrottledError(Exception):
+    """The site asked us to come back later than the scheduler will wait"""
 
 
 class IndiaBixScraper:
     """Scraper for IndiaBix questions"""
     
-    def __init__(self, timeout: int = 30, user_agent: Optional[str] = None):
+    def __init__(self, timeout: int = 30, user_agent: Optional[str] = None,
+                 max_workers: int = 1, cache=None, offline: bool = False,
+                 parser: str = 'lxml', parse_processes: int = 0, session=None,
+                 scheduler=None, throttle_retries: int = 3, base_url: Optional[str] = None,
+                 tracer=None, deadline: Optional[float] = None):
+        """
+        Args:
+            timeout: HTTP request timeout in seconds
+            user_agent: User-Agent header to send
+            max_workers: Number of pages fetched concurrently per section
+            cache: Optional HttpCache used to revalidate and store pages
+            offline: Serve pages only from the cache, never touching the network
+            parser: Preferred BeautifulSoup backend (falls back to html.parser)
+            parse_processes: Parse pages in this many worker processes (0 or 1 parses in-process)
+            session: Shared requests.Session to use instead of creating a private one
+            scheduler: Optional RequestScheduler pacing requests per host
+            throttle_retries: Times a 429/503 response is retried after backing off
+            base_url: Site to accept URLs from and resolve relative image links
+                against, instead of https://www.indiabix.com
+            tracer: Optional tracing.Tracer receiving fetch, parse, extract
+                and format spans
+            deadline: Optional time.monotonic() value no request may run
+                past; each request's timeout is cut to the time left, and
+                requests after it raise InterruptedError
+        """
         self.timeout = timeout
+        self.deadline = deadline
+        self.max_workers = max(1, int(max_workers or 1))
+        self.cache = cache
+        self.offline = offline
+        self.parser = resolve_parser(parser)
+        self.parse_processes = int(parse_processes or 0)
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.tracer = tracer or NULL_TRACER
+        self._cancelled = threading.Event()
+        if session is not None:
+            # Pool size, retries and User-Agent are configured by the owner
+            self.session = session
+            return
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': user_agent or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        if self.max_workers > 1:
+            # Let every worker thread keep its own connection alive
+            adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+    
+    def cancel(self):
+        """
+        Ask a running scrape to stop
+        
+        No new requests are started; requests already in flight finish
+        within the request timeout and their pages are discarded.
+        """
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called"""
+        return self._cancelled.is_set()
     
     def validate_url(self, url: str) -> bool:
-        """Validate if the URL is from IndiaBix"""
-        parsed = urlparse(url)
-        return 'indiabix.com' in parsed.netloc.lower()
+        """Validate if the URL is from IndiaBix (or the configured base URL's host)"""
+        netloc = urlparse(url).netloc.lower()
+        return 'indiabix.com' in netloc or netloc == urlparse(self.base_url).netloc.lower()
     
     def extract_category_from_url(self, url: str) -> str:
         """Extract category name from URL for tagging"""
@@ -132,42 +453,180 @@ class IndiaBixScraper:
         
         return "IndiaBix"
     
-    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch and parse a webpage"""
+    def _request_timeout(self) -> float:
+        """The request timeout, cut to the time left before the deadline"""
+        if self.deadline is None:
+            return self.timeout
+        left = self.deadline - time.monotonic()
+        if left <= 0:
+            raise InterruptedError("Deadline passed")
+        return min(self.timeout, left)
+    
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """GET a URL, pacing it through the request scheduler when there is one"""
+        if self.scheduler is None:
+            return self.session.get(url, timeout=self._request_timeout(), headers=headers)
+        
+        for attempt in range(self.throttle_retries + 1):
+            with self.scheduler.slot(url, cancelled=lambda: self.cancelled) as slot:
+                response = self.session.get(url, timeout=self._request_timeout(), headers=headers)
+                slot.done(response.status_code, response.headers.get('Retry-After'))
+            # The scheduler has backed off; the next slot waits out any Retry-After
+            if response.status_code not in self.scheduler.throttle_statuses:
+                break
+            if slot.retry_after is not None and slot.retry_after > self.scheduler.max_pause:
+                raise ThrottledError(
+                    f"{url} asked to retry after {slot.retry_after:.0f}s "
+                    f"(more than {self.scheduler.max_pause:.0f}s)"
+                )
+        return response
+    
+    def fetch_content(self, url: str) -> bytes:
+        """
+        Fetch the raw body of a webpage
+        
+        With a cache, known pages are revalidated with If-None-Match /
+        If-Modified-Since and a 304 response is served from disk.
+        """
+        with self.tracer.span('fetch', url=url) as span:
+            content, status = self._fetch_content(url)
+            span.set(status=status, bytes=len(content))
+            return content
+    
+    def _fetch_content(self, url: str) -> Tuple[bytes, object]:
+        """fetch_content, also returning the HTTP status ('cache' when served offline)"""
+        cached = self.cache.get(url) if self.cache else None
+        
+        if self.offline:
+            if cached is None:
+                raise Exception(f"Failed to fetch page: {url} is not cached (offline mode)")
+            return cached.body, 'cache'
+        
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            headers = self.cache.conditional_headers(cached) if self.cache else {}
+            response = self._get(url, headers)
+            
+            if response.status_code == 304 and cached is not None:
+                self.cache.touch(url)
+                return cached.body, 304
+            
+            if response.status_code in (404, 410):
+                raise PageNotFoundError(f"Failed to fetch page: {url} returned {response.status_code}")
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
         except requests.exceptions.RequestException as e:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                # Timed out because the deadline ran out, not the site
+                raise InterruptedError(f"Deadline passed fetching {url}")
             raise Exception(f"Failed to fetch page: {str(e)}")
+        
+        if self.cache:
+            self.cache.put(
+                url,
+                response.content,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        return response.content, response.status_code
+    
+    def discover_current_affairs(self, index_url: str) -> Dict[str, str]:
+        """
+        Find the daily current-affairs pages linked from a listing page
+        
+        Only the raw HTML is scanned for links, no tree is built.
+        
+        Returns:
+            Dict mapping "YYYY-MM-DD" to the absolute URL of that day's page
+        """
+        content = self.fetch_content(index_url)
+        return {
+            date.decode('ascii'): urljoin(index_url, href.decode('utf-8', 'replace'))
+            for href, date in CURRENT_AFFAIRS_LINK_RE.findall(content)
+        }
+    
+    def parse_html(self, content: bytes) -> BeautifulSoup:
+        """Parse only the question containers and pagination links of a page"""
+        with self.tracer.span('parse', bytes=len(content)):
+            return BeautifulSoup(content, self.parser, parse_only=QuestionPageStrainer())
+    
+    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Fetch and parse a webpage"""
+        return self.parse_html(self.fetch_content(url))
+    
+    def _fetch_page_safe(self, page_num: int, page_url: str, raw: bool = False) -> Tuple[Optional[BeautifulSoup], Optional[Exception]]:
+        """Fetch a page, returning the error instead of raising it"""
+        if self.cancelled:
+            return None, InterruptedError("Scrape cancelled")
+        try:
+            print(f"Fetching page {page_num}: {page_url}")
+            if raw:
+                return self.fetch_content(page_url), None
+            return self.fetch_page(page_url), None
+        except Exception as e:
+            return None, e
+    
+    def iter_pages(self, page_urls: List[str], start: int = 1,
+                   raw: bool = False) -> Iterator[Tuple[int, Optional[BeautifulSoup], Optional[Exception]]]:
+        """
+        Fetch pages in page order, keeping up to max_workers requests in flight
+        
+        Yields (page_num, soup, error) tuples so a failing page doesn't stop the others.
+        With raw=True the unparsed page bytes are yielded instead of a soup.
+        """
+        if self.max_workers <= 1 or len(page_urls) <= 1:
+            for page_num, page_url in enumerate(page_urls, start):
+                soup, error = self._fetch_page_safe(page_num, page_url, raw)
+                yield page_num, soup, error
+            return
+        
+        urls = enumerate(page_urls, start)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for page_num, page_url in itertools.islice(urls, self.max_workers):
+                pending.append((page_num, executor.submit(self._fetch_page_safe, page_num, page_url, raw)))
+            
+            while pending:
+                page_num, future = pending.popleft()
+                # Top up the window before blocking so the pool stays busy
+                for next_num, next_url in itertools.islice(urls, 1):
+                    pending.append((next_num, executor.submit(self._fetch_page_safe, next_num, next_url, raw)))
+                soup, error = future.result()
+                yield page_num, soup, error
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
     
     def parse_question(self, question_div) -> Optional[Dict]:
         """Parse a single question from the page"""
         try:
             question_data = {}
+            parts = extract_question_parts(question_div)
             
             # Extract question text - look for bix-td-qtxt class
-            question_text_elem = question_div.find('div', class_='bix-td-qtxt')
+            question_text_elem = parts['question']
             
             if question_text_elem:
+                junk, images = parts['sections'][id(question_text_elem)]
+                
                 # Remove script and style elements
-                for script in question_text_elem(['script', 'style']):
+                for script in junk:
                     script.decompose()
                 
-                # Find and convert images to absolute URLs
-                images = question_text_elem.find_all('img')
+                # Convert images to absolute URLs
                 for img in images:
                     src = img.get('src', '')
                     if src:
                         # Convert relative URLs to absolute
-                        absolute_url = urljoin('https://www.indiabix.com', src)
+                        absolute_url = urljoin(self.base_url, src)
                         img['src'] = absolute_url
                 
                 # Get HTML with images preserved
                 question_html = str(question_text_elem)
                 # Get text-only version and format it
                 raw_question_text = question_text_elem.get_text(strip=True)
-                formatted_question_text = format_question_text(raw_question_text)
+                with self.tracer.span('format'):
+                    formatted_question_text = format_question_text(raw_question_text)
                 
                 # Store both versions
                 question_data['question'] = formatted_question_text
@@ -176,11 +635,9 @@ class IndiaBixScraper:
             else:
                 return None
             
-            # Extract options - look for bix-opt-row divs
+            # Extract options - from the bix-opt-row divs
             options = {}
-            option_rows = question_div.find_all('div', class_='bix-opt-row')
-            
-            for i, option_row in enumerate(option_rows):
+            for i, option_row in enumerate(parts['options']):
                 # Get the option text
                 option_text = option_row.get_text(strip=True)
                 # Use A, B, C, D based on position
@@ -191,18 +648,15 @@ class IndiaBixScraper:
             question_data['options'] = options
             
             # Extract answer
-            answer_div = question_div.find('div', class_='bix-ans-option')
+            answer_div = parts['answer_div']
             if answer_div:
-                # Look for span with class containing 'option-svg-letter-'
                 # The answer letter is encoded in the class name (e.g., 'option-svg-letter-c')
-                answer_span = answer_div.find('span', class_=re.compile(r'option-svg-letter-'))
+                answer_span = parts['answer_span']
                 if answer_span:
-                    span_classes = answer_span.get('class', [])
-                    for cls in span_classes:
+                    for cls in answer_span.get('class', []):
                         if 'option-svg-letter-' in cls:
                             # Extract the letter from the class name and convert to uppercase
-                            answer_letter = cls.split('-')[-1].upper()
-                            question_data['answer'] = answer_letter
+                            question_data['answer'] = cls.split('-')[-1].upper()
                             break
                 else:
                     # Fallback: try to extract from text (old method)
@@ -212,7 +666,7 @@ class IndiaBixScraper:
                         question_data['answer'] = answer_match.group(1)
             else:
                 # Backup: check for old class name
-                answer_span = question_div.find('span', class_='jq-hdnakqb')
+                answer_span = parts['hidden_answer']
                 if answer_span:
                     answer_text = answer_span.get_text(strip=True)
                     answer_match = re.search(r'([A-E])', answer_text)
@@ -220,26 +674,26 @@ class IndiaBixScraper:
                         question_data['answer'] = answer_match.group(1)
             
             # Extract explanation
-            explanation_div = question_div.find('div', class_='bix-ans-description')
-            if not explanation_div:
-                explanation_div = question_div.find('div', class_='bix-div-answer-description')
+            explanation_div = parts['description'] or parts['answer_description']
             
             if explanation_div:
+                junk, exp_images = parts['sections'][id(explanation_div)]
+                
                 # Remove script and style elements
-                for script in explanation_div(['script', 'style']):
+                for script in junk:
                     script.decompose()
                 
-                # Find and convert images to absolute URLs
-                exp_images = explanation_div.find_all('img')
+                # Convert images to absolute URLs
                 for img in exp_images:
                     src = img.get('src', '')
                     if src:
-                        absolute_url = urljoin('https://www.indiabix.com', src)
+                        absolute_url = urljoin(self.base_url, src)
                         img['src'] = absolute_url
                 
                 # Get text and format it for better readability
                 raw_text = explanation_div.get_text(strip=True)
-                formatted_text = format_explanation_text(raw_text)
+                with self.tracer.span('format'):
+                    formatted_text = format_explanation_text(raw_text)
                 
                 # Store both formatted text and HTML versions
                 question_data['explanation'] = formatted_text
@@ -254,81 +708,183 @@ class IndiaBixScraper:
             print(f"Error parsing question: {str(e)}")
             return None
     
-    def scrape_section(self, url: str, max_pages: int = 10) -> List[Dict]:
-        """Scrape all questions from a section (handles pagination)"""
-        questions = []
-        current_page = 1
-        
-        # Get all page URLs first
+    def find_page_urls(self, url: str, soup: BeautifulSoup, max_pages: int = 10) -> List[str]:
+        """Collect the section's pagination URLs from its first page"""
         page_urls = [url]  # Start with the first page
-        first_page_soup = None
         
+        # Find all pagination links with 6-digit format (IndiaBix style)
+        all_links = soup.find_all('a', href=True)
+        base_path = urlparse(url).path.rstrip('/')
+        
+        for link in all_links:
+            href = link.get('href')
+            # Match IndiaBix pagination: /category/subcategory/006001
+            if href and base_path in href and PAGINATION_HREF_RE.search(href):
+                full_url = urljoin(url, href)
+                if full_url not in page_urls:
+                    page_urls.append(full_url)
+        
+        # Limit to max_pages
+        return page_urls[:max_pages]
+    
+    def iter_page_questions(self, soup: BeautifulSoup, page_num: int) -> Iterator[Dict]:
+        """Parse the questions on one page, yielding each as soon as it is parsed"""
+        # Find all question containers
+        question_divs = soup.find_all('div', class_='bix-div-container')
+        
+        if not question_divs:
+            print(f"No questions found on page {page_num}")
+            return
+        
+        page_questions = 0
+        for q_div in question_divs:
+            with self.tracer.span('extract'):
+                parsed_q = self.parse_question(q_div)
+            if parsed_q:
+                parsed_q['page'] = page_num
+                page_questions += 1
+                yield parsed_q
+        
+        print(f"Found {page_questions} questions on page {page_num}")
+    
+    def _iter_parsed_pages(self, page_urls: List[str], start: int = 1):
+        """
+        Fetch and parse pages in page order, yielding (page_num, questions, error)
+        
+        Parsing happens in this process unless parse_processes asks for a
+        worker pool, in which case raw page bytes are shipped to the pool.
+        """
+        pool = get_parse_pool(self.parse_processes) if self.parse_processes > 1 else None
+        if pool is None:
+            for page_num, soup, error in self.iter_pages(page_urls, start):
+                questions = self.iter_page_questions(soup, page_num) if soup else ()
+                yield page_num, questions, error
+            return
+        
+        # Entries are (page_num, content, future, error); keep a few pages
+        # queued per worker so the pool never waits on the network
+        pending = deque()
+        window = self.parse_processes * 2
+        executor = pool
+        
+        def next_result():
+            page_num, content, future, error = pending.popleft()
+            if error:
+                return page_num, None, error
+            try:
+                if future is not None:
+                    try:
+                        return page_num, future.result(), None
+                    except BrokenProcessPool:
+                        print("Parse worker pool stopped, parsing in-process")
+                        discard_parse_pool(executor)
+                return page_num, parse_page_content(content, page_num, self.parser, self.base_url), None
+            except Exception as e:
+                return page_num, None, e
+        
+        for page_num, content, error in self.iter_pages(page_urls, start, raw=True):
+            future = None
+            if content is not None and pool is not None:
+                try:
+                    future = pool.submit(parse_page_content, content, page_num, self.parser, self.base_url)
+                except Exception as e:
+                    print(f"Process pool unavailable, parsing in-process: {e}")
+                    discard_parse_pool(pool)
+                    pool = None
+            pending.append((page_num, content, future, error))
+            if len(pending) > window:
+                yield next_result()
+        
+        while pending:
+            yield next_result()
+    
+    def _iter_section(self, url: str, max_pages: int = 10,
+                      progress_callback=None, strict: bool = False) -> Iterator[Dict]:
+        """
+        Yield questions from a section page by page (handles pagination)
+        
+        progress_callback(page_num, total_pages) is called after each page
+        has been fetched and all of its questions yielded. With strict=True
+        a failure to fetch the first page is raised instead of yielding
+        nothing, and a cancelled scrape raises InterruptedError, so callers
+        can tell "no questions" from "no page" or "gave up waiting".
+        """
         try:
             # Fetch first page to find all pagination links
-            print(f"Fetching page {current_page}: {url}")
+            print(f"Fetching page 1: {url}")
             first_page_soup = self.fetch_page(url)
+            if not first_page_soup:
+                return
             
-            if first_page_soup:
-                # Find all pagination links with 6-digit format (IndiaBix style)
-                all_links = first_page_soup.find_all('a', href=True)
-                base_path = urlparse(url).path.rstrip('/')
-                
-                for link in all_links:
-                    href = link.get('href')
-                    # Match IndiaBix pagination: /category/subcategory/006001
-                    if href and base_path in href and re.search(r'/\d{6}$', href):
-                        full_url = urljoin(url, href)
-                        if full_url not in page_urls:
-                            page_urls.append(full_url)
-                
-                # Limit to max_pages
-                page_urls = page_urls[:max_pages]
-                print(f"Found {len(page_urls)} pages to scrape")
+            page_urls = self.find_page_urls(url, first_page_soup, max_pages)
+            print(f"Found {len(page_urls)} pages to scrape")
         
         except Exception as e:
+            if strict:
+                raise
             print(f"Error finding pagination: {str(e)}")
-            # If we can't fetch the first page, return empty
-            return questions
+            # If we can't fetch the first page, there is nothing to yield
+            return
+        
+        # Now scrape all pages, reusing the first page we already fetched.
+        # Only the pages being parsed are kept alive, so memory stays bounded.
+        pages = itertools.chain(
+            [(1, self.iter_page_questions(first_page_soup, 1), None)],
+            self._iter_parsed_pages(page_urls[1:], start=2)
+        )
+        del first_page_soup
         
-        # Now scrape all pages
-        for page_num, page_url in enumerate(page_urls, 1):
+        for page_num, questions, error in pages:
+            if self.cancelled:
+                print(f"Scrape cancelled before page {page_num}")
+                if strict:
+                    raise InterruptedError("Scrape cancelled")
+                return
+            
             try:
-                # Use cached first page soup if available
-                if page_num == 1 and first_page_soup:
-                    soup = first_page_soup
-                else:
-                    print(f"Fetching page {page_num}: {page_url}")
-                    soup = self.fetch_page(page_url)
+                if error:
+                    raise error
                 
-                if not soup:
-                    continue
-                
-                # Find all question containers
-                question_divs = soup.find_all('div', class_='bix-div-container')
-                
-                if not question_divs:
-                    print(f"No questions found on page {page_num}")
-                    continue
-                
-                page_questions = 0
-                for q_div in question_divs:
-                    parsed_q = self.parse_question(q_div)
-                    if parsed_q:
-                        questions.append(parsed_q)
-                        page_questions += 1
-                
-                print(f"Found {page_questions} questions on page {page_num}")
+                for question in questions:
+                    # Lets DeckBuilder derive a stable GUID for re-imports
+                    question['source_url'] = url
+                    yield question
                 
             except Exception as e:
                 print(f"Error on page {page_num}: {str(e)}")
-                continue
+            
+            if progress_callback:
+                progress_callback(page_num, len(page_urls))
+    
+    def scrape_section(self, url: str, max_pages: int = 10, strict: bool = False) -> List[Dict]:
+        """Scrape all questions from a section (handles pagination)"""
+        return list(self._iter_section(url, max_pages, strict=strict))
+    
+    def iter_questions(self, url: str, max_pages: int = 10,
+                       progress_callback=None) -> Iterator[Dict]:
+        """
+        Stream questions from a section as they are parsed
+        
+        Each question dict carries a 'page' key with its 1-based page number
+        and a 'source_url' key with the section URL.
+        Unlike scrape_url, nothing is accumulated, so callers can import or
+        preview questions while later pages are still downloading.
         
-        return questions
+        progress_callback(page_num, total_pages) is called after each page.
+        """
+        if not self.validate_url(url):
+            raise ValueError("Invalid IndiaBix URL")
+        
+        yield from self._iter_section(url, max_pages, progress_callback)
     
-    def scrape_url(self, url: str, max_pages: int = 10) -> Dict:
+    def scrape_url(self, url: str, max_pages: int = 10, strict: bool = False) -> Dict:
         """
         Main scraping function that returns all data
         
+        With strict=True, errors fetching the first page (including
+        PageNotFoundError) and cancellation (InterruptedError) are raised
+        rather than returning no questions.
+        
         Returns:
             Dict with 'questions', 'category', and 'total' keys
         """
@@ -336,7 +892,7 @@ class IndiaBixScraper:
             raise ValueError("Invalid IndiaBix URL")
         
         category = self.extract_category_from_url(url)
-        questions = self.scrape_section(url, max_pages)
+        questions = self.scrape_section(url, max_pages, strict=strict)
         
         return {
             'questions': questions,
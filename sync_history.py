@@ -0,0 +1,350 @@
+"""
+Sync History Module
+Per-date record of Current Affairs syncs, stored in SQLite next to the add-on
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from datetime import date as Date
+from typing import Dict, List, Optional, NamedTuple, Set
+
+STATUS_SYNCED = 'synced'
+STATUS_EMPTY = 'empty'    # Page missing (404) or had no questions
+STATUS_FAILED = 'failed'  # Network or import error
+STATUS_NEVER = 'never'    # Missed too often; assumed never published
+
+# Negative-cache policy for empty dates: retry after base_ttl, doubling
+# per miss up to max_ttl, and give up after give_up_after misses once the
+# date is at least SETTLE_DAYS old (IndiaBix sometimes publishes late)
+DEFAULT_BASE_TTL = 30 * 60
+DEFAULT_MAX_TTL = 24 * 60 * 60
+DEFAULT_GIVE_UP_AFTER = 5
+SETTLE_DAYS = 2
+
+
+class SyncRecord(NamedTuple):
+    """What happened the last time a date was synced"""
+    date: str
+    status: str
+    question_count: Optional[int]
+    content_hash: Optional[str]
+    last_attempt: float
+    failure_reason: Optional[str]
+    misses: int
+    retry_after: Optional[float]
+
+
+class MonthIndex(NamedTuple):
+    """Published days of one month, as discovered from its listing page"""
+    month: str                      # "YYYY-MM"
+    fetched: float
+    dates: Optional[Dict[str, str]]  # date -> URL; None if no index exists
+    complete: bool                  # Fetched after the month was over
+
+
+def questions_hash(questions: List[Dict]) -> str:
+    """Fingerprint of a day's questions, to tell whether the page changed"""
+    digest = hashlib.sha1()
+    for question in questions:
+        digest.update(json.dumps(
+            [question.get('question', ''), question.get('options', {}), question.get('answer', '')],
+            sort_keys=True, ensure_ascii=False
+        ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SyncHistory:
+    """
+    Indexed sync history keyed by ISO date ("YYYY-MM-DD")
+
+    Dates sort lexically, so range queries are plain BETWEEN lookups on the
+    primary key. The database runs in WAL mode so the dialogs can read
+    while a sync is writing. A legacy sync_history.json next to it is
+    imported on first open and renamed to sync_history.json.migrated.
+    """
+
+    def __init__(self, path: str, legacy_json_path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS history (
+                date TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                question_count INTEGER,
+                content_hash TEXT,
+                last_attempt REAL NOT NULL,
+                failure_reason TEXT,
+                misses INTEGER NOT NULL DEFAULT 0,
+                retry_after REAL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS month_index (
+                month TEXT PRIMARY KEY,
+                fetched REAL NOT NULL,
+                dates TEXT,
+                complete INTEGER NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        # Databases created before the negative cache lack its columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(history)")}
+        if 'misses' not in columns:
+            self._conn.execute("ALTER TABLE history ADD COLUMN misses INTEGER NOT NULL DEFAULT 0")
+        if 'retry_after' not in columns:
+            self._conn.execute("ALTER TABLE history ADD COLUMN retry_after REAL")
+        self._conn.commit()
+        if legacy_json_path and os.path.exists(legacy_json_path):
+            self.migrate_json(legacy_json_path)
+
+    def migrate_json(self, json_path: str) -> int:
+        """
+        Import a sync_history.json ({"YYYY-MM-DD": true, ...}) and rename it
+
+        Dates already in the database are left as they are.
+
+        Returns:
+            Number of dates imported
+        """
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            attempted = os.path.getmtime(json_path)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {json_path} for migration: {e}")
+            return 0
+
+        rows = [(date, STATUS_SYNCED, attempted)
+                for date, synced in legacy.items() if synced]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO history (date, status, last_attempt) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            imported = self._conn.total_changes - before
+
+        try:
+            os.replace(json_path, json_path + ".migrated")
+        except OSError as e:
+            print(f"Error renaming {json_path}: {e}")
+        print(f"Migrated {imported} dates from {os.path.basename(json_path)}")
+        return imported
+
+    def get(self, date: str) -> Optional[SyncRecord]:
+        """Return the record for a date, or None if it was never attempted"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM history WHERE date = ?", (date,)
+            ).fetchone()
+        return SyncRecord(*row) if row else None
+
+    def is_synced(self, date: str) -> bool:
+        record = self.get(date)
+        return record is not None and record.status == STATUS_SYNCED
+
+    def range(self, start: str, end: str) -> List[SyncRecord]:
+        """Records for start <= date <= end, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM history WHERE date BETWEEN ? AND ? ORDER BY date", (start, end)
+            ).fetchall()
+        return [SyncRecord(*row) for row in rows]
+
+    def synced_dates(self, start: str, end: str) -> Set[str]:
+        """Dates in start..end that were synced successfully"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM history WHERE date BETWEEN ? AND ? AND status = ?",
+                (start, end, STATUS_SYNCED)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def should_fetch(self, date: str, now: Optional[float] = None) -> bool:
+        """False if the date is synced, never published, or still backing off"""
+        record = self.get(date)
+        if record is None:
+            return True
+        if record.status in (STATUS_SYNCED, STATUS_NEVER):
+            return False
+        return not record.retry_after or record.retry_after <= (now or time.time())
+
+    def dates_to_skip(self, start: str, end: str, now: Optional[float] = None) -> Set[str]:
+        """Dates in start..end that should_fetch() would refuse"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT date FROM history WHERE date BETWEEN ? AND ?
+                   AND (status IN (?, ?) OR retry_after > ?)""",
+                (start, end, STATUS_SYNCED, STATUS_NEVER, now or time.time())
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def never_published(self, start: str, end: str) -> Set[str]:
+        """Dates in start..end that were given up on"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM history WHERE date BETWEEN ? AND ? AND status = ?",
+                (start, end, STATUS_NEVER)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def record_success(self, date: str, question_count: Optional[int] = None,
+                       content_hash: Optional[str] = None):
+        """Mark a date as synced"""
+        self._put(date, STATUS_SYNCED, question_count, content_hash, None)
+
+    def record_failure(self, date: str, reason: str, status: str = STATUS_FAILED):
+        """
+        Record an unsuccessful attempt
+
+        A date that was already synced keeps its status; only the attempt
+        time and reason are updated.
+        """
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO history (date, status, last_attempt, failure_reason)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (date) DO UPDATE SET
+                    status = CASE WHEN status = ? THEN status ELSE excluded.status END,
+                    last_attempt = excluded.last_attempt,
+                    failure_reason = excluded.failure_reason
+            """, (date, status, time.time(), reason, STATUS_SYNCED))
+            self._conn.commit()
+
+    def record_miss(self, date: str, reason: str, base_ttl: float = DEFAULT_BASE_TTL,
+                    max_ttl: float = DEFAULT_MAX_TTL,
+                    give_up_after: int = DEFAULT_GIVE_UP_AFTER) -> SyncRecord:
+        """
+        Record that a date had no content (404 or no questions)
+
+        The date is not fetched again for base_ttl * 2 ** (misses - 1)
+        seconds, capped at max_ttl. After give_up_after misses, and once the
+        date is SETTLE_DAYS old, it is marked never published.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, misses FROM history WHERE date = ?", (date,)
+            ).fetchone()
+            if row and row[0] == STATUS_SYNCED:
+                # Keep a successful sync; the page may simply have moved
+                self._conn.execute(
+                    "UPDATE history SET last_attempt = ?, failure_reason = ? WHERE date = ?",
+                    (now, reason, date)
+                )
+                self._conn.commit()
+            else:
+                misses = (row[1] if row else 0) + 1
+                status = STATUS_EMPTY
+                try:
+                    age = (Date.today() - Date.fromisoformat(date)).days
+                except ValueError:
+                    age = 0
+                if give_up_after and misses >= give_up_after and age >= SETTLE_DAYS:
+                    status = STATUS_NEVER
+                retry_after = now + min(base_ttl * 2 ** (misses - 1), max_ttl)
+                self._conn.execute(
+                    """INSERT OR REPLACE INTO history
+                       (date, status, last_attempt, failure_reason, misses, retry_after)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (date, status, now, reason, misses, retry_after)
+                )
+                self._conn.commit()
+        return self.get(date)
+
+    def get_month_index(self, month: str) -> Optional[MonthIndex]:
+        """Return the cached index for a "YYYY-MM" month, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched, dates, complete FROM month_index WHERE month = ?", (month,)
+            ).fetchone()
+        if not row:
+            return None
+        dates = json.loads(row[1]) if row[1] is not None else None
+        return MonthIndex(month, row[0], dates, bool(row[2]))
+
+    def put_month_index(self, month: str, dates: Optional[Dict[str, str]], complete: bool):
+        """Cache a month's published dates (None records that no index exists)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO month_index VALUES (?, ?, ?, ?)",
+                (month, time.time(), json.dumps(dates) if dates is not None else None, int(complete))
+            )
+            self._conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Small persistent settings, e.g. when auto-sync last ran"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    def forget(self, date: str):
+        """Drop a date so the next sync imports it again"""
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE date = ?", (date,))
+            self._conn.commit()
+
+    def _put(self, date: str, status: str, question_count: Optional[int],
+             content_hash: Optional[str], failure_reason: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO history
+                   (date, status, question_count, content_hash, last_attempt, failure_reason)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (date, status, question_count, content_hash, time.time(), failure_reason)
+            )
+            self._conn.commit()
+
+
+_shared_histories: Dict[str, SyncHistory] = {}
+_shared_lock = threading.Lock()
+
+
+def get_sync_history_store(addon_dir: Optional[str] = None) -> SyncHistory:
+    """
+    Return the add-on's shared sync history, migrating sync_history.json
+    the first time it is opened
+    """
+    addon_dir = addon_dir or os.path.dirname(__file__)
+    path = os.path.join(addon_dir, "sync_history.sqlite3")
+    with _shared_lock:
+        history = _shared_histories.get(path)
+        if history is None:
+            history = SyncHistory(path, os.path.join(addon_dir, "sync_history.json"))
+            _shared_histories[path] = history
+        return history
+
+
+def startup_sync_due(config: Optional[Dict], history: Optional[SyncHistory] = None) -> bool:
+    """
+    Whether the startup Current Affairs sync should run: it is enabled and
+    the previous one began at least 'auto_sync_interval_minutes' ago
+
+    Only needs the sync history, so the add-on can decide this at startup
+    without importing the scraper.
+    """
+    config = config or {}
+    if not config.get('auto_sync_current_affairs', True):
+        print("Auto-sync is disabled")
+        return False
+
+    history = history or get_sync_history_store()
+    interval = config.get('auto_sync_interval_minutes', 60) * 60
+    last_run = history.get_meta('last_auto_sync')
+    if last_run and time.time() - float(last_run) < interval:
+        print("Current Affairs auto-sync ran recently, skipping")
+        return False
+    return True
@@ -0,0 +1,178 @@
+"""
+Test that the compiled formatters produce exactly the same output as the
+original sequence of re.sub passes they replaced
+"""
+
+import os
+import re
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import format_question_text, format_explanation_text, MAX_FORMAT_LENGTH
+
+
+# Reference implementations, copied from scraper.py before the rewrite
+
+def reference_format_question_text(text: str) -> str:
+    """
+    Format question text for better readability.
+    Detects and formats code blocks, adds proper line breaks.
+    """
+    if not text:
+        return ""
+    
+    # Check if the text contains code patterns
+    has_code = any([
+        '#include' in text,
+        'int main()' in text,
+        'printf(' in text,
+        'return 0' in text,
+        '{' in text and '}' in text,
+        'void ' in text,
+        'class ' in text,
+        'def ' in text,
+        'function ' in text,
+        'for(' in text or 'while(' in text,
+        'if(' in text,
+    ])
+    
+    if has_code:
+        # Format as code block
+        # Add line breaks after common code patterns
+        text = re.sub(r'(#include[^>]*>)', r'\1\n', text)
+        text = re.sub(r'(int main\(\))', r'\n\1', text)
+        text = re.sub(r'({)', r'\1\n', text)
+        text = re.sub(r'(})', r'\n\1', text)
+        text = re.sub(r'(;)(?=\s*[a-zA-Z_])', r'\1\n', text)
+        text = re.sub(r'(return \d+;)', r'\n\1', text)
+        
+        # Clean up multiple line breaks
+        text = re.sub(r'\n{3,}', '\n\n', text)
+    else:
+        # Regular question formatting
+        # Add line breaks after question marks if followed by capital letter
+        text = re.sub(r'\?([A-Z])', r'?\n\n\1', text)
+        
+        # Add line breaks after periods followed by capital letters
+        text = re.sub(r'\.([A-Z][a-z])', r'.\n\n\1', text)
+    
+    # Clean up any leading/trailing whitespace
+    text = text.strip()
+    
+    return text
+
+
+def reference_format_explanation_text(text: str) -> str:
+    """
+    Format explanation text for better readability.
+    Adds line breaks after sentences and around step numbers.
+    """
+    if not text:
+        return ""
+    
+    # Add line breaks before "Step X:" patterns
+    text = re.sub(r'(Step \d+:)', r'\n\n\1 ', text)
+    
+    # Add line breaks after semicolons in steps
+    text = re.sub(r';(?=[a-z])', r';\n', text)
+    
+    # Add line breaks around "here" explanations  
+    text = re.sub(r'([;,])here ', r'\1\n\nHere ', text, flags=re.IGNORECASE)
+    
+    # Add line breaks before "Hence" for conclusions
+    text = re.sub(r'([\.;])Hence ', r'\1\n\nHence ', text, flags=re.IGNORECASE)
+    
+    # Add line breaks before "So" for conclusions
+    text = re.sub(r'([\.;])So ', r'\1\n\nSo ', text, flags=re.IGNORECASE)
+    
+    # Add line breaks before "Therefore"
+    text = re.sub(r'([\.;])Therefore ', r'\1\n\nTherefore ', text, flags=re.IGNORECASE)
+    
+    # Add line breaks after periods followed by capital letters
+    text = re.sub(r'\.([A-Z])', r'.\n\n\1', text)
+    
+    # Add line breaks before "This means", "This is", etc.
+    text = re.sub(r'\.This ', r'.\n\nThis ', text)
+    
+    # Add line breaks before "The answer", "The output", "The result"
+    text = re.sub(r'\.(The (?:answer|output|result|solution))', r'.\n\n\1', text, flags=re.IGNORECASE)
+    
+    # Remove multiple consecutive line breaks (more than 2)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    
+    # Clean up any leading/trailing whitespace
+    text = text.strip()
+    
+    return text
+
+
+SAMPLES = [
+    "Point out the error, if any in the program.#include int main() { int i = 1; switch(i) { printf(\"This is c program.\"); case 1: printf(\"Case1\"); break; case 2: printf(\"Case2\"); break; } return 0; }",
+    "#include<stdio.h>#include<string.h>int main(){ char s[] = \"abc\"; printf(\"%d\", strlen(s)); return 0;}",
+    "What is the capital of India?Choose the best answer.Mumbai is not it.",
+    "Who was the first President of India?",
+    "Step 1:Let the number be x;then 2x = 10;here x = 5.Hence the answer is 5.",
+    "Speed = Distance/Time;so speed is 10 km/hr.So the train takes 2 hours.Therefore the answer is B.",
+    "The output is 5.This is because i is incremented.the answer is B.THE RESULT follows.",
+    "Here is a list,here we go;Here it is.HENCE proved;Therefore done.",
+    ".Step 1:start.Step 2:continue.Step X:nope",
+    "",
+    "   ",
+    "\n\n\nStep 1:\n\n\n.So \n",
+]
+
+VOCABULARY = [
+    '.', ';', ',', '?', ':', ' ', '\n', '\n\n', 'a', 'B', 'x', '_', '1', '42',
+    'Step ', 'Step 1:', 'Step 23:', 'here ', 'Here ', 'HERE ', 'hence ', 'Hence ',
+    'So ', 'so ', '\u017fo ', 'Therefore ', 'The answer', 'the output', 'THE RESULT',
+    'the solution', 'This ', 'Apple', 'iPhone', '#include', '#include <stdio.h>', '>',
+    'int main()', '{', '}', 'return 0;', 'return 12;', 'printf(', 'for(', 'while(',
+    'if(', 'class ', 'def ', 'void ', '\u212a',
+]
+
+
+def random_text(rng: random.Random) -> str:
+    return ''.join(rng.choice(VOCABULARY) for _ in range(rng.randint(0, 30)))
+
+
+def check(label, func, reference, text) -> bool:
+    expected = reference(text)
+    actual = func(text)
+    if actual != expected:
+        print(f"❌ {label} differs for {text!r}")
+        print(f"   expected: {expected!r}")
+        print(f"   actual:   {actual!r}")
+        return False
+    return True
+
+
+def main():
+    ok = True
+    for text in SAMPLES:
+        ok &= check("format_question_text", format_question_text, reference_format_question_text, text)
+        ok &= check("format_explanation_text", format_explanation_text, reference_format_explanation_text, text)
+    print(f"{'✅' if ok else '❌'} Fixed samples")
+    
+    rng = random.Random(1234)
+    for _ in range(20000):
+        text = random_text(rng)
+        if not check("format_question_text", format_question_text, reference_format_question_text, text):
+            ok = False
+            break
+        if not check("format_explanation_text", format_explanation_text, reference_format_explanation_text, text):
+            ok = False
+            break
+    print(f"{'✅' if ok else '❌'} Randomized comparison")
+    
+    # Pathological input is passed through unformatted instead of being scanned
+    huge = "#include " * (MAX_FORMAT_LENGTH // 4)
+    ok &= format_question_text(huge) == huge.strip()
+    print(f"{'✅' if ok else '❌'} Length guard")
+    
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,219 @@
+"""
+Test the scraper end to end against the local mock IndiaBix server
+Runs without Anki or network access
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import threading
+import pstats
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_indiabix import Faults, MockIndiaBixServer
+from http_cache import HttpCache
+from http_session import build_session
+from rate_limiter import RequestScheduler
+from scraper import IndiaBixScraper, PageNotFoundError, ThrottledError
+from tracing import make_tracer, NULL_TRACER
+import profiling
+
+SECTION = "/aptitude/problems-on-trains/"
+
+
+def quietly(func, *args, **kwargs):
+    with redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_pagination(server, scraper):
+    assert scraper.validate_url(server.url(SECTION))
+    questions = quietly(scraper.scrape_section, server.url(SECTION), max_pages=10)
+    assert len(questions) == 50, len(questions)
+    assert {q['page'] for q in questions} == set(range(1, 11))
+    assert all(q['question'] and q['answer'] for q in questions)
+    images = [q for q in questions if q.get('has_images')]
+    assert images and server.base_url in images[0]['question_html']
+    assert server.stats()['statuses'] == {200: 10}
+    print("✅ Section pages follow the 6-digit pagination")
+    return questions
+
+
+def test_revalidation(server, scraper, first):
+    server.reset_stats()
+    again = quietly(scraper.scrape_section, server.url(SECTION), max_pages=10)
+    assert again == first
+    assert server.stats()['statuses'] == {304: 10}, server.stats()
+    print("✅ Cached pages are revalidated with ETags (304)")
+
+
+def test_cache_eviction(tmp):
+    # touch_interval=-1: every hit counts, however quick
+    cache = HttpCache(os.path.join(tmp, "lru.sqlite3"), max_bytes=3000, touch_interval=-1)
+    for name in ("a", "b"):
+        cache.put(name, os.urandom(1000))
+    assert cache.get("a") is not None  # a is now more recently used than b
+    cache.put("c", os.urandom(1000))
+    assert cache.get("b") is None and cache.get("a") and cache.get("c")
+    assert cache.total_size() <= cache.max_bytes
+    print("✅ Cache hits count as use when evicting")
+
+
+def test_current_affairs(server, scraper):
+    days = scraper.discover_current_affairs(server.url("/current-affairs/2025/11/"))
+    assert len(days) == 25 and "2025-11-02" not in days  # Sundays are unpublished
+    assert days["2025-11-03"] == server.url("/current-affairs/2025-11-03/")
+
+    questions = quietly(scraper.scrape_section, days["2025-11-03"], max_pages=1, strict=True)
+    assert len(questions) == server.current_affairs_questions
+    for day in ("2025-11-02", "2099-01-01"):
+        try:
+            quietly(scraper.scrape_section, server.url(f"/current-affairs/{day}/"), strict=True)
+        except PageNotFoundError:
+            pass
+        else:
+            raise AssertionError(f"{day} should be a 404")
+    print("✅ Current Affairs month index and daily routes")
+
+
+def test_faults():
+    faults = Faults(throttle_rate=0.3, retry_after=0, drop_rate=0.1, seed=3)
+    with MockIndiaBixServer(faults=faults, section_questions=50) as server:
+        scheduler = RequestScheduler(rate=0, max_concurrency=4)
+        scraper = IndiaBixScraper(max_workers=4, session=build_session(pool_size=4, retries=5),
+                                  scheduler=scheduler, throttle_retries=10, base_url=server.base_url)
+        questions = quietly(scraper.scrape_section, server.url(SECTION), max_pages=10)
+        stats = server.stats()
+        assert len(questions) == 50, len(questions)
+        assert stats['statuses'].get(429) and stats['dropped'], stats
+        assert scheduler.limiter(server.base_url).state()['throttled'] == stats['statuses'][429]
+    print(f"✅ Scrape completes through {stats['statuses'][429]} 429s and {stats['dropped']} dropped connections")
+
+
+def test_cancel_in_flight():
+    # The startup watchdog cancels while the only request is still running
+    with MockIndiaBixServer(faults=Faults(latency=0.5), today=date(2025, 11, 30)) as server:
+        scraper = IndiaBixScraper(base_url=server.base_url)
+        timer = threading.Timer(0.2, scraper.cancel)
+        timer.start()
+        try:
+            quietly(scraper.scrape_url, server.url("/current-affairs/2025-11-03/"), max_pages=1, strict=True)
+        except InterruptedError:
+            pass
+        else:
+            raise AssertionError("a cancelled strict scrape must not look like a day without questions")
+        timer.join()
+        assert server.stats()['statuses'] == {200: 1}
+    print("✅ Cancelling a strict scrape mid-request raises InterruptedError")
+
+
+def test_deadline():
+    # A request started just before the deadline may only use the time left
+    with MockIndiaBixServer(faults=Faults(latency=2), today=date(2025, 11, 30)) as server:
+        scraper = IndiaBixScraper(timeout=30, base_url=server.base_url,
+                                  session=build_session(retries=0), deadline=time.monotonic() + 0.5)
+        start = time.monotonic()
+        try:
+            quietly(scraper.scrape_url, server.url("/current-affairs/2025-11-03/"), max_pages=1, strict=True)
+        except InterruptedError:
+            pass
+        else:
+            raise AssertionError("the request should have been cut off at the deadline")
+        assert time.monotonic() - start < 1.5
+    print("✅ Requests are cut off at the scraper's deadline")
+
+
+def test_long_retry_after():
+    faults = Faults(throttle_rate=1.0, retry_after=3600)
+    with MockIndiaBixServer(faults=faults, section_questions=10) as server:
+        scheduler = RequestScheduler(rate=0, max_pause=1)
+        scraper = IndiaBixScraper(scheduler=scheduler, base_url=server.base_url)
+        start = time.monotonic()
+        try:
+            quietly(scraper.scrape_section, server.url(SECTION), strict=True)
+        except ThrottledError:
+            pass
+        else:
+            raise AssertionError("a one-hour Retry-After should fail the request")
+        assert time.monotonic() - start < 5
+        assert server.stats()['requests'] == 1
+        assert scheduler.limiter(server.base_url).state()['paused_for'] <= 1
+    print("✅ A Retry-After longer than max_retry_after fails instead of sleeping")
+
+
+def test_tracing(server, tmp):
+    assert make_tracer({}, "scrape") is NULL_TRACER
+    tracer = make_tracer({'trace_stages': True, 'trace_file': os.path.join(tmp, "trace.jsonl")}, "scrape")
+    scraper = IndiaBixScraper(max_workers=4, base_url=server.base_url, tracer=tracer)
+    quietly(scraper.scrape_section, server.url(SECTION), max_pages=10)
+    tracer.close()
+
+    stats = tracer.stats()
+    assert stats['fetch'].count == 10 and stats['fetch'].statuses == {'200': 10}
+    assert stats['parse'].count == 10 and stats['parse'].bytes == stats['fetch'].bytes > 0
+    assert stats['extract'].count == 50 and stats['format'].count >= 50
+    summary = tracer.summary()
+    assert summary[0].startswith("Stage timings for scrape") and summary[1].startswith("fetch")
+
+    with open(os.path.join(tmp, "trace.jsonl"), encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f]
+    assert len(spans) == sum(stage.count for stage in stats.values())
+    fetches = [span for span in spans if span['stage'] == 'fetch']
+    assert all(span['status'] == 200 and span['bytes'] and span['url'] for span in fetches)
+    print(f"✅ Tracing spans: {', '.join(f'{name} {stage.count}' for name, stage in stats.items())}")
+
+
+def test_profiling(server, tmp):
+    profiling.PROFILE_DIR = os.path.join(tmp, "profiles")
+    captured = []
+    profiling.on_captured = lambda operation, paths: captured.append((operation, paths))
+    scraper = IndiaBixScraper(base_url=server.base_url)
+
+    with profiling.capture("scrape"):
+        pass
+    assert not captured  # not armed
+
+    profiling.arm()
+    with profiling.capture("scrape"):
+        quietly(scraper.scrape_section, server.url(SECTION), max_pages=3)
+    with profiling.capture("scrape"):
+        pass
+    assert len(captured) == 1 and not profiling.is_armed()
+
+    operation, (profile_path, report_path) = captured[0]
+    stats = pstats.Stats(profile_path)
+    assert any(func[2] == 'parse_question' for func in stats.stats)
+    with open(report_path, encoding="utf-8") as f:
+        report = f.read()
+    assert "Peak traced memory" in report and "allocation sites" in report
+    print(f"✅ Armed profiling captured one scrape ({os.path.basename(profile_path)})")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp, \
+            MockIndiaBixServer(section_questions=50, today=date(2025, 11, 30)) as server:
+        cache = HttpCache(os.path.join(tmp, "cache.sqlite3"))
+        scraper = IndiaBixScraper(max_workers=4, cache=cache, base_url=server.base_url)
+        questions = test_pagination(server, scraper)
+        test_revalidation(server, scraper, questions)
+        test_cache_eviction(tmp)
+        test_current_affairs(server, scraper)
+        test_tracing(server, tmp)
+        test_profiling(server, tmp)
+        test_faults()
+        test_long_retry_after()
+        test_cancel_in_flight()
+        test_deadline()
+    print("All mock server tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Test the SQLite sync history store and the sync_history.json migration
+Runs without Anki
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sync_history import (
+    SyncHistory, STATUS_EMPTY, STATUS_FAILED, STATUS_NEVER, STATUS_SYNCED, questions_hash
+)
+
+
+def test_migration(tmp):
+    legacy = os.path.join(tmp, "sync_history.json")
+    with open(legacy, 'w', encoding='utf-8') as f:
+        json.dump({"2025-10-30": True, "2025-10-31": True, "2025-11-01": False}, f)
+
+    history = SyncHistory(os.path.join(tmp, "sync_history.sqlite3"), legacy)
+    assert history.is_synced("2025-10-30")
+    assert history.is_synced("2025-10-31")
+    assert not history.is_synced("2025-11-01")
+    assert not os.path.exists(legacy)
+    assert os.path.exists(legacy + ".migrated")
+    print("✅ sync_history.json migrated and renamed")
+    return history
+
+
+def test_records(history):
+    questions = [{'question': 'Q1', 'options': {'A': 'x'}, 'answer': 'A'}]
+    history.record_success("2025-11-02", 1, questions_hash(questions))
+    history.record_failure("2025-11-03", "No questions found", STATUS_EMPTY)
+    history.record_failure("2025-11-04", "timed out")
+
+    record = history.get("2025-11-02")
+    assert record.status == STATUS_SYNCED and record.question_count == 1
+    assert record.content_hash == questions_hash(questions)
+    assert history.get("2025-11-03").status == STATUS_EMPTY
+    assert history.get("2025-11-04").failure_reason == "timed out"
+    assert history.get("2025-11-04").status == STATUS_FAILED
+
+    # A later failure must not undo a successful sync
+    history.record_failure("2025-11-02", "timed out")
+    assert history.is_synced("2025-11-02")
+    print("✅ Status, count, hash and failure reason recorded")
+
+
+def test_range_queries(history):
+    dates = [record.date for record in history.range("2025-10-31", "2025-11-03")]
+    assert dates == ["2025-10-31", "2025-11-02", "2025-11-03"], dates
+    assert history.synced_dates("2025-10-01", "2025-11-30") == {
+        "2025-10-30", "2025-10-31", "2025-11-02"
+    }
+    history.forget("2025-11-02")
+    assert not history.is_synced("2025-11-02")
+    print("✅ Range queries and forget()")
+
+
+def test_negative_cache(history):
+    now = time.time()
+    record = history.record_miss("2025-09-01", "returned 404", base_ttl=60, give_up_after=3)
+    assert record.status == STATUS_EMPTY and record.misses == 1
+    assert 59 <= record.retry_after - now <= 61
+    assert not history.should_fetch("2025-09-01")
+    assert history.should_fetch("2025-09-01", now=now + 61)
+    assert "2025-09-01" in history.dates_to_skip("2025-09-01", "2025-09-30")
+
+    record = history.record_miss("2025-09-01", "returned 404", base_ttl=60, give_up_after=3)
+    assert record.misses == 2 and 119 <= record.retry_after - now <= 121
+    record = history.record_miss("2025-09-01", "returned 404", base_ttl=60, give_up_after=3)
+    assert record.status == STATUS_NEVER
+    assert not history.should_fetch("2025-09-01", now=now + 10 ** 6)
+    assert history.never_published("2025-09-01", "2025-09-30") == {"2025-09-01"}
+
+    # Today's page may still appear, so it is never given up on
+    today = date.today().isoformat()
+    for _ in range(5):
+        record = history.record_miss(today, "No questions found", base_ttl=60, give_up_after=3)
+    assert record.status == STATUS_EMPTY
+
+    history.record_success(today, 10)
+    assert history.get(today).misses == 0 and history.should_fetch(today) is False
+    print("✅ Negative cache back-off and never-published marker")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = test_migration(tmp)
+        test_records(history)
+        test_range_queries(history)
+        test_negative_cache(history)
+    print("All sync history tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Tracing Module
+Lightweight per-stage timing spans for scrapes, imports and syncs
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+# Summary order; stages not listed here are reported after these
+STAGES = ['fetch', 'parse', 'extract', 'format', 'build', 'lookup', 'dedup', 'insert', 'update']
+
+
+class Span:
+    """
+    Times one unit of work; attributes (bytes, status, ...) can be added
+    with set() while it runs
+    """
+
+    __slots__ = ('tracer', 'stage', 'attrs', 'start')
+
+    def __init__(self, tracer: 'Tracer', stage: str, attrs: Dict):
+        self.tracer = tracer
+        self.stage = stage
+        self.attrs = attrs
+        self.start = 0.0
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.stage, duration, self.attrs)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class StageStats:
+    """Running totals for one stage"""
+
+    __slots__ = ('count', 'total', 'max', 'bytes', 'errors', 'statuses')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+
+    def describe(self, stage: str) -> str:
+        avg = self.total / self.count if self.count else 0.0
+        text = (f"{stage:<8} {self.count:>6} × {avg * 1000:7.2f} ms avg, "
+                f"max {self.max * 1000:.1f} ms, total {self.total:.2f}s")
+        if self.bytes:
+            text += f", {self.bytes / 1e6:.2f} MB"
+        if self.statuses:
+            text += " (" + ", ".join(f"{status}×{count}" for status, count in sorted(self.statuses.items())) + ")"
+        if self.errors:
+            text += f", {self.errors} failed"
+        return text
+
+
+class Tracer:
+    """
+    Collects spans for one operation
+
+    Every span updates per-stage totals for summary(); with a jsonl_path
+    each span is also appended to that file as one JSON object per line.
+    Safe to use from worker threads.
+    """
+
+    enabled = True
+
+    def __init__(self, operation: str = "", jsonl_path: Optional[str] = None):
+        self.operation = operation
+        self.jsonl_path = jsonl_path
+        self.started = time.perf_counter()
+        self._stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if jsonl_path:
+            try:
+                self._file = open(jsonl_path, 'a', encoding='utf-8')
+            except OSError as e:
+                print(f"Error opening trace file {jsonl_path}: {e}")
+
+    def span(self, stage: str, **attrs) -> Span:
+        """Context manager timing one unit of work in a stage"""
+        return Span(self, stage, attrs)
+
+    def record(self, stage: str, duration: float, attrs: Optional[Dict] = None):
+        """Add a finished span"""
+        attrs = attrs or {}
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.bytes += attrs.get('bytes') or 0
+            if 'error' in attrs:
+                stats.errors += 1
+            status = attrs.get('status')
+            if status is not None:
+                stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+            if self._file:
+                entry = {'operation': self.operation, 'stage': stage, 'time': time.time(),
+                         'ms': round(duration * 1000, 3)}
+                entry.update(attrs)
+                self._file.write(json.dumps(entry, default=str) + "\n")
+
+    def stats(self) -> Dict[str, StageStats]:
+        with self._lock:
+            return dict(self._stages)
+
+    def summary(self) -> List[str]:
+        """One line per stage, in pipeline order, for a status log"""
+        stages = self.stats()
+        if not stages:
+            return []
+        order = [stage for stage in STAGES if stage in stages]
+        order += sorted(stage for stage in stages if stage not in STAGES)
+        elapsed = time.perf_counter() - self.started
+        lines = [f"Stage timings for {self.operation or 'operation'} ({elapsed:.2f}s wall clock):"]
+        lines += [stages[stage].describe(stage) for stage in order]
+        return lines
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class NullTracer(Tracer):
+    """Tracer used when tracing is off: spans are shared no-ops"""
+
+    enabled = False
+
+    def __init__(self):
+        self.operation = ""
+        self.jsonl_path = None
+
+    def span(self, stage: str, **attrs) -> _NullSpan:
+        return _NULL_SPAN
+
+    def record(self, stage: str, duration: float, attrs: Optional[Dict] = None):
+        pass
+
+    def stats(self) -> Dict[str, StageStats]:
+        return {}
+
+    def summary(self) -> List[str]:
+        return []
+
+    def close(self):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+def make_tracer(config: Optional[Dict], operation: str) -> Tracer:
+    """
+    Tracer for one scrape, import or sync, or NULL_TRACER unless the
+    'trace_stages' config option is on
+
+    'trace_file' names a JSON-lines file spans are appended to; relative
+    paths are resolved against the add-on folder.
+    """
+    config = config or {}
+    if not config.get('trace_stages', False):
+        return NULL_TRACER
+    path = config.get('trace_file') or None
+    if path and not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return Tracer(operation, path)
@@ -7,14 +7,63 @@ from aqt import mw
 from aqt.qt import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QComboBox, QCheckBox, QSpinBox, QProgressBar,
-    QTextEdit, QGroupBox, QMessageBox, Qt
+    QTextEdit, QGroupBox, QMessageBox, Qt, QThread, pyqtSignal
 )
 from aqt.utils import showInfo, showWarning, tooltip
+from aqt.operations import CollectionOp
+from anki.collection import OpChanges
 from typing import Optional
 import json
 
 from . import scraper
 from . import deck_builder
+from .http_cache import get_http_cache
+from .http_session import build_session
+from .rate_limiter import get_request_scheduler
+from .dedup_index import get_duplicate_index
+from .tracing import make_tracer, NULL_TRACER
+from . import profiling
+
+
+# Scrape threads still finishing after their dialog closed; referenced here
+# until they exit, so Qt never destroys a running thread
+_detached_threads = set()
+
+
+class ScrapeThread(QThread):
+    """Runs a scrape off the GUI thread, reporting progress after every page"""
+    
+    page_done = pyqtSignal(int, int, int)  # page number, total pages, questions so far
+    succeeded = pyqtSignal(object)         # same dict as IndiaBixScraper.scrape_url
+    failed = pyqtSignal(str)
+    
+    def __init__(self, scraper_obj, url: str, max_pages: int, parent=None):
+        super().__init__(parent)
+        self.scraper = scraper_obj
+        self.url = url
+        self.max_pages = max_pages
+    
+    def run(self):
+        questions = []
+        
+        def on_page(page_num, total_pages):
+            self.page_done.emit(page_num, total_pages, len(questions))
+        
+        try:
+            with profiling.capture("scrape"):
+                for question in self.scraper.iter_questions(self.url, self.max_pages,
+                                                            progress_callback=on_page):
+                    questions.append(question)
+            
+            if not self.scraper.cancelled:
+                self.succeeded.emit({
+                    'questions': questions,
+                    'category': self.scraper.extract_category_from_url(self.url),
+                    'total': len(questions),
+                    'url': self.url
+                })
+        except Exception as e:
+            self.failed.emit(str(e))
 
 
 class IndiaBixDialog(QDialog):
@@ -23,6 +72,8 @@ class IndiaBixDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scraper = None
+        self.scrape_thread = None
+        self.scrape_tracer = NULL_TRACER
         self.scraped_data = None
         self.setWindowTitle("IndiaBix Flashcard Generator")
         self.setMinimumWidth(600)
@@ -38,11 +89,45 @@ class IndiaBixDialog(QDialog):
                 self.default_deck = config.get('default_deck', 'IndiaBix::General')
                 self.auto_tag = config.get('auto_tag', True)
                 self.timeout = config.get('timeout', 30)
+                self.max_workers = config.get('max_workers', 4)
+                self.offline_mode = config.get('offline_mode', False)
+                self.html_parser = config.get('html_parser', 'lxml')
+                self.parse_processes = config.get('parse_processes', 0)
+                self.batch_size = config.get('batch_size', 50)
+                self.http_cache = get_http_cache(config)
+                # No transport retries: after Cancel, a hung request must
+                # not be retried, so the scrape stops within one timeout
+                self.http_session = build_session(
+                    pool_size=max(int(config.get('http_pool_size', 10)), self.max_workers),
+                    retries=0,
+                    keep_alive=config.get('http_keep_alive', True),
+                    user_agent=config.get('user_agent')
+                )
+                self.request_scheduler = get_request_scheduler(config)
+                self.near_duplicates = config.get('near_duplicates', 'flag')
+                self.near_duplicate_threshold = config.get('near_duplicate_threshold', 0.7)
+                self.base_url = config.get('base_url') or None
+                self.trace_config = {
+                    'trace_stages': config.get('trace_stages', False),
+                    'trace_file': config.get('trace_file', ''),
+                }
         except Exception as e:
             print(f"Error loading config: {e}")
             self.default_deck = 'IndiaBix::General'
             self.auto_tag = True
             self.timeout = 30
+            self.max_workers = 4
+            self.offline_mode = False
+            self.html_parser = 'lxml'
+            self.parse_processes = 0
+            self.batch_size = 50
+            self.http_cache = None
+            self.http_session = build_session(pool_size=self.max_workers, retries=0)
+            self.request_scheduler = None
+            self.near_duplicates = 'flag'
+            self.near_duplicate_threshold = 0.7
+            self.base_url = None
+            self.trace_config = {}
     
     def setup_ui(self):
         """Setup the user interface"""
@@ -135,6 +220,11 @@ class IndiaBixDialog(QDialog):
         self.scrape_button.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
         button_layout.addWidget(self.scrape_button)
         
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_scrape)
+        self.cancel_button.setVisible(False)
+        button_layout.addWidget(self.cancel_button)
+        
         self.import_button = QPushButton("Import to Anki")
         self.import_button.clicked.connect(self.import_to_anki)
         self.import_button.setEnabled(False)
@@ -201,62 +291,147 @@ class IndiaBixDialog(QDialog):
             self.status_text.verticalScrollBar().maximum()
         )
     
+    def log_trace(self, tracer):
+        """Add a finished operation's stage timings to the status log and close its trace file"""
+        for line in tracer.summary():
+            self.add_status(f"⏱ {line}")
+        tracer.close()
+    
     def scrape_questions(self):
-        """Scrape questions from the provided URL"""
+        """Start scraping questions from the provided URL in the background"""
         url = self.url_input.text().strip()
         
         if not url:
             showWarning("Please enter a valid IndiaBix URL")
             return
         
+        self.status_text.clear()
+        self.add_status(f"Starting scraper for: {url}")
+        
+        # Initialize scraper
+        self.scrape_tracer = make_tracer(self.trace_config, "scrape")
+        self.scraper = scraper.IndiaBixScraper(
+            timeout=self.timeout,
+            max_workers=self.max_workers,
+            cache=self.http_cache,
+            offline=self.offline_mode,
+            parser=self.html_parser,
+            parse_processes=self.parse_processes,
+            session=self.http_session,
+            scheduler=self.request_scheduler,
+            base_url=self.base_url,
+            tracer=self.scrape_tracer
+        )
+        
+        # Validate URL
+        if not self.scraper.validate_url(url):
+            error = "Invalid IndiaBix URL. Please check the URL and try again."
+            self.add_status(f"✗ Error: {error}")
+            showWarning(f"Scraping failed: {error}")
+            return
+        
+        self.add_status("URL validated successfully")
+        
+        max_pages = self.max_pages_spin.value()
+        self.add_status(f"Scraping up to {max_pages} pages...")
+        
         # Disable buttons during scraping
         self.scrape_button.setEnabled(False)
         self.import_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate progress
+        self.progress_bar.setRange(0, 0)  # Indeterminate until the page count is known
+        self.scraped_data = None
         
-        self.status_text.clear()
-        self.add_status(f"Starting scraper for: {url}")
+        self.scrape_thread = ScrapeThread(self.scraper, url, max_pages, self)
+        self.scrape_thread.page_done.connect(self.on_scrape_page)
+        self.scrape_thread.succeeded.connect(self.on_scrape_succeeded)
+        self.scrape_thread.failed.connect(self.on_scrape_failed)
+        self.scrape_thread.finished.connect(self.on_scrape_finished)
+        self.scrape_thread.start()
+    
+    def on_scrape_page(self, page_num: int, total_pages: int, questions: int):
+        """Update progress after each scraped page"""
+        self.progress_bar.setRange(0, total_pages)
+        self.progress_bar.setValue(page_num)
+        self.add_status(f"Page {page_num}/{total_pages}: {questions} questions found so far")
+        if self.request_scheduler:
+            self.add_status(self.request_scheduler.describe(self.scrape_thread.url))
+    
+    def on_scrape_succeeded(self, scraped_data: dict):
+        """Handle a completed scrape"""
+        total = scraped_data['total']
+        category = scraped_data['category']
         
-        try:
-            # Initialize scraper
-            self.scraper = scraper.IndiaBixScraper(timeout=self.timeout)
-            
-            # Validate URL
-            if not self.scraper.validate_url(url):
-                raise ValueError("Invalid IndiaBix URL. Please check the URL and try again.")
-            
-            self.add_status("URL validated successfully")
-            
-            # Scrape questions
-            max_pages = self.max_pages_spin.value()
-            self.add_status(f"Scraping up to {max_pages} pages...")
-            
-            self.scraped_data = self.scraper.scrape_url(url, max_pages=max_pages)
-            
-            total = self.scraped_data['total']
-            category = self.scraped_data['category']
-            
-            if total == 0:
-                raise Exception("No questions found. The page structure may have changed.")
-            
-            self.add_status(f"✓ Successfully scraped {total} questions from '{category}'")
-            self.add_status(f"Ready to import into Anki deck: {self.deck_combo.currentText()}")
-            
-            # Enable import button
-            self.import_button.setEnabled(True)
-            tooltip(f"Successfully scraped {total} questions!")
-            
-        except Exception as e:
-            self.add_status(f"✗ Error: {str(e)}")
-            showWarning(f"Scraping failed: {str(e)}")
+        if total == 0:
+            self.on_scrape_failed("No questions found. The page structure may have changed.")
+            return
         
-        finally:
-            self.scrape_button.setEnabled(True)
-            self.progress_bar.setVisible(False)
+        self.scraped_data = scraped_data
+        self.add_status(f"✓ Successfully scraped {total} questions from '{category}'")
+        self.add_status(f"Ready to import into Anki deck: {self.deck_combo.currentText()}")
+        
+        # Enable import button
+        self.import_button.setEnabled(True)
+        tooltip(f"Successfully scraped {total} questions!")
+    
+    def on_scrape_failed(self, error: str):
+        """Report a failed scrape"""
+        self.add_status(f"✗ Error: {error}")
+        showWarning(f"Scraping failed: {error}")
+    
+    def on_scrape_finished(self):
+        """Restore the controls once the scrape thread has stopped"""
+        if self.scraper and self.scraper.cancelled:
+            self.add_status("Scrape cancelled")
+        self.log_trace(self.scrape_tracer)
+        self.scrape_tracer = NULL_TRACER
+        self.scrape_button.setEnabled(True)
+        self.cancel_button.setVisible(False)
+        self.progress_bar.setVisible(False)
+        self.scrape_thread = None
+    
+    def cancel_scrape(self):
+        """Stop the running scrape; in-flight requests end within the timeout"""
+        if self.scraper and self.scrape_thread:
+            self.scraper.cancel()
+            self.cancel_button.setEnabled(False)
+            self.add_status("Cancelling... waiting for in-flight requests to finish")
+    
+    def stop_scrape_thread(self):
+        """
+        Cancel a running scrape without waiting for it
+        
+        The thread is detached from the dialog and finishes on its own
+        (within one request timeout); its results are discarded.
+        """
+        thread = self.scrape_thread
+        if thread is None or not thread.isRunning():
+            return
+        self.scraper.cancel()
+        for signal in (thread.page_done, thread.succeeded, thread.failed, thread.finished):
+            signal.disconnect()
+        thread.setParent(None)
+        _detached_threads.add(thread)
+        thread.finished.connect(lambda: _detached_threads.discard(thread))
+        thread.finished.connect(thread.deleteLater)
+        self.scrape_thread = None
+        self.scrape_tracer.close()
+        self.scrape_tracer = NULL_TRACER
+    
+    def done(self, result: int):
+        """Stop any running scrape before the dialog is dismissed"""
+        self.stop_scrape_thread()
+        super().done(result)
+    
+    def closeEvent(self, event):
+        """Stop any running scrape before the dialog is closed"""
+        self.stop_scrape_thread()
+        super().closeEvent(event)
     
     def import_to_anki(self):
-        """Import scraped questions to Anki"""
+        """Import scraped questions to Anki as one background, undoable operation"""
         if not self.scraped_data or not self.scraped_data.get('questions'):
             showWarning("No questions to import. Please scrape questions first.")
             return
@@ -266,56 +441,87 @@ class IndiaBixDialog(QDialog):
             showWarning("Please select a target deck")
             return
         
+        questions = self.scraped_data['questions']
+        total = len(questions)
+        
         # Disable buttons during import
         self.scrape_button.setEnabled(False)
         self.import_button.setEnabled(False)
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, len(self.scraped_data['questions']))
+        self.progress_bar.setRange(0, total)
         self.progress_bar.setValue(0)
         
-        self.add_status(f"\nImporting {len(self.scraped_data['questions'])} cards to '{deck_name}'...")
+        self.add_status(f"\nImporting {total} cards to '{deck_name}'...")
         
-        try:
-            # Prepare tags
-            tags = []
-            if self.auto_tag_checkbox.isChecked():
-                category = self.scraped_data['category']
-                tags.append(category.replace('::', '_').replace(' ', '_'))
-            tags.append('IndiaBix')
-            
-            # Initialize deck builder
-            builder = deck_builder.DeckBuilder(mw.col)
-            
-            # Import questions
-            imported = 0
-            for i, question in enumerate(self.scraped_data['questions']):
-                try:
-                    builder.add_question(
-                        deck_name=deck_name,
-                        question_data=question,
-                        tags=tags,
-                        include_explanation=self.include_explanation_checkbox.isChecked()
-                    )
-                    imported += 1
-                    self.progress_bar.setValue(i + 1)
-                except Exception as e:
-                    self.add_status(f"Warning: Failed to import question {i+1}: {str(e)}")
-            
-            # Save changes
-            mw.col.reset()
-            mw.reset()
-            
-            self.add_status(f"✓ Successfully imported {imported} out of {len(self.scraped_data['questions'])} cards!")
+        # Prepare tags
+        tags = []
+        if self.auto_tag_checkbox.isChecked():
+            category = self.scraped_data['category']
+            tags.append(category.replace('::', '_').replace(' ', '_'))
+        tags.append('IndiaBix')
+        
+        include_explanation = self.include_explanation_checkbox.isChecked()
+        result = {'imported': 0, 'stats': {}}
+        tracer = make_tracer(self.trace_config, "import")
+        
+        def on_progress(current: int, total_questions: int):
+            # Called from the background thread after every batch
+            mw.taskman.run_on_main(lambda: self.progress_bar.setValue(current))
+        
+        def op(col) -> OpChanges:
+            # Everything below becomes a single "Import from IndiaBix" undo step
+            undo_start = col.add_custom_undo_entry("Import from IndiaBix")
+            duplicate_index = get_duplicate_index({
+                'near_duplicates': self.near_duplicates,
+                'near_duplicate_threshold': self.near_duplicate_threshold,
+            }, col)
+            builder = deck_builder.DeckBuilder(
+                col,
+                duplicate_index=duplicate_index,
+                skip_duplicates=self.near_duplicates == 'skip',
+                tracer=tracer
+            )
+            with profiling.capture("import"):
+                result['imported'] = builder.add_questions_batch(
+                    deck_name=deck_name,
+                    questions=questions,
+                    tags=tags,
+                    include_explanation=include_explanation,
+                    progress_callback=on_progress,
+                    batch_size=self.batch_size
+                )
+            result['stats'] = builder.last_stats
+            return col.merge_undo_entries(undo_start)
+        
+        def on_success(changes):
+            imported = result['imported']
+            stats = result['stats']
+            self.add_status(f"✓ Successfully imported {imported} out of {total} cards!")
+            if stats.get('updated') or stats.get('unchanged'):
+                self.add_status(f"  {stats['updated']} existing cards updated, "
+                                f"{stats['unchanged']} already up to date")
+            if stats.get('duplicates'):
+                action = "skipped" if self.near_duplicates == 'skip' else \
+                    f"tagged {deck_builder.NEAR_DUPLICATE_TAG}"
+                self.add_status(f"  {stats['duplicates']} near-duplicates of existing cards {action}")
             self.add_status("Cards are now available in your Anki collection.")
+            self.log_trace(tracer)
+            self.finish_import()
             
             showInfo(f"Successfully imported {imported} flashcards to deck '{deck_name}'!\n\n"
                     f"You can now study these cards or sync them to AnkiWeb.")
-            
-        except Exception as e:
-            self.add_status(f"✗ Import Error: {str(e)}")
-            showWarning(f"Import failed: {str(e)}")
         
-        finally:
-            self.scrape_button.setEnabled(True)
-            self.import_button.setEnabled(True)
-            self.progress_bar.setVisible(False)
+        def on_failure(error: Exception):
+            self.add_status(f"✗ Import Error: {str(error)}")
+            self.log_trace(tracer)
+            self.finish_import()
+            showWarning(f"Import failed: {str(error)}")
+        
+        # The main window refreshes itself once when the operation completes
+        CollectionOp(parent=self, op=op).success(on_success).failure(on_failure).run_in_background()
+    
+    def finish_import(self):
+        """Restore the controls after an import"""
+        self.scrape_button.setEnabled(True)
+        self.import_button.setEnabled(True)
+        self.progress_bar.setVisible(False)